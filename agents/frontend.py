@@ -3,19 +3,291 @@ Vibe Coding System - Frontend Agent
 Responsible for generating frontend code based on project requirements
 """
 
+import html
 import os
-import json
+import re
 import logging
 import google.generativeai as genai
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 import asyncio
 
+from core import json_utils
 from core.config import Settings
 from core.file_manager import FileManager
-from core.utils import clean_json_string, parse_json_string
+from core.llm_client import LLMClient, PromptTemplate, get_model
+from core.utils import parse_json_string
 
 logger = logging.getLogger(__name__)
 
+# Map priority to order of execution
+_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+# Description keyword to FrontendAgent handler, checked in order
+_TASK_HANDLERS = (
+    ("component", "_generate_component"),
+    ("page", "_generate_page"),
+    ("style", "_generate_styles"),
+    ("service", "_generate_service"),
+    ("api", "_generate_service"),
+)
+
+# Keywords that name the preceding word as a component, page or service
+_COMPONENT_KINDS = ("component", "widget", "element")
+_PAGE_KINDS = ("page", "screen", "view")
+_SERVICE_KINDS = ("service", "api", "client")
+
+# A word followed by a naming keyword, e.g. "Header component". The match is a
+# lookahead so overlapping pairs such as "user api client" are all found.
+_NAME_RE = re.compile(
+    r"(?<!\S)(?=(\S+)\s+(" + "|".join(_COMPONENT_KINDS + _PAGE_KINDS + _SERVICE_KINDS) + r")\b)",
+    re.IGNORECASE
+)
+_NON_ALNUM_RE = re.compile(r"[\W_]")
+_NON_ALNUM_OR_HYPHEN_RE = re.compile(r"[^\w-]|_")
+
+# A response wrapped in a markdown code block, with any info string (e.g. "tsx title=App")
+_FENCE_RE = re.compile(r"^```[^\n]*\n(.*?)\n?```\s*$", re.DOTALL)
+
+# Static package.json per framework, used unless settings.llm_generated_config is set
+_PACKAGE_JSON_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "react": {
+        "name": "app",
+        "version": "1.0.0",
+        "private": True,
+        "description": "React frontend",
+        "scripts": {
+            "start": "webpack serve --mode development",
+            "build": "webpack --mode production",
+            "test": "jest"
+        },
+        "dependencies": {
+            "react": "^18.2.0",
+            "react-dom": "^18.2.0"
+        },
+        "devDependencies": {
+            "@babel/core": "^7.23.0",
+            "@babel/plugin-transform-runtime": "^7.23.0",
+            "@babel/preset-env": "^7.23.0",
+            "@babel/preset-react": "^7.22.0",
+            "babel-loader": "^9.1.3",
+            "html-webpack-plugin": "^5.5.3",
+            "jest": "^29.7.0",
+            "webpack": "^5.89.0",
+            "webpack-cli": "^5.1.4",
+            "webpack-dev-server": "^4.15.1"
+        }
+    },
+    "vue": {
+        "name": "app",
+        "version": "1.0.0",
+        "private": True,
+        "description": "Vue frontend",
+        "scripts": {
+            "serve": "vue-cli-service serve",
+            "build": "vue-cli-service build",
+            "test": "vue-cli-service test:unit"
+        },
+        "dependencies": {
+            "vue": "^3.3.0"
+        },
+        "devDependencies": {
+            "@vue/cli-plugin-babel": "^5.0.8",
+            "@vue/cli-plugin-unit-jest": "^5.0.8",
+            "@vue/cli-service": "^5.0.8"
+        }
+    },
+    "angular": {
+        "name": "app",
+        "version": "1.0.0",
+        "private": True,
+        "description": "Angular frontend",
+        "scripts": {
+            "start": "ng serve",
+            "build": "ng build",
+            "test": "ng test"
+        },
+        "dependencies": {
+            "@angular/common": "^16.2.0",
+            "@angular/compiler": "^16.2.0",
+            "@angular/core": "^16.2.0",
+            "@angular/platform-browser": "^16.2.0",
+            "@angular/platform-browser-dynamic": "^16.2.0",
+            "@angular/router": "^16.2.0",
+            "rxjs": "~7.8.0",
+            "tslib": "^2.6.0",
+            "zone.js": "~0.13.0"
+        },
+        "devDependencies": {
+            "@angular-devkit/build-angular": "^16.2.0",
+            "@angular/cli": "^16.2.0",
+            "@angular/compiler-cli": "^16.2.0",
+            "typescript": "~5.1.3"
+        }
+    }
+}
+
+_INDEX_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>{title}</title>
+</head>
+<body>
+  {mount_point}
+</body>
+</html>
+"""
+
+_INDEX_HTML_MOUNT_POINTS = {
+    "react": '<div id="root"></div>',
+    "vue": '<div id="app"></div>',
+    "angular": "<app-root></app-root>",
+}
+
+# Prompt templates, filled in per task with str.format
+_COMPONENT_PROMPT = PromptTemplate("frontend.component", """
+Act as an expert frontend developer using {frontend_framework}.
+
+Create a {frontend_framework} component based on the following details:
+
+Component Name: {component_name}
+Task Description: {description}
+
+{file_section}
+
+The component should:
+1. Follow {frontend_framework} best practices
+2. Be well-structured and maintainable
+3. Include appropriate PropTypes/TypeScript types
+4. Have clean, minimal styling
+5. Include comments explaining complex logic
+
+Implement the component fully without placeholders.
+{output_instruction}
+""")
+
+_PAGE_PROMPT = PromptTemplate("frontend.page", """
+Act as an expert frontend developer using {frontend_framework}.
+
+Create a {frontend_framework} page component based on the following details:
+
+Page Name: {page_name}
+Task Description: {description}
+
+{file_section}
+
+The page should:
+1. Follow {frontend_framework} best practices
+2. Include layout elements (header, footer, main content)
+3. Be responsive
+4. Handle loading/error states if data fetching is involved
+5. Include routing configuration if needed
+
+Implement the page fully without placeholders.
+{output_instruction}
+""")
+
+_STYLES_PROMPT = PromptTemplate("frontend.styles", """
+Act as an expert frontend stylist using {styling_approach}.
+
+Create styles based on the following details:
+
+Task Description: {description}
+Framework: {frontend_framework}
+Styling Approach: {styling_approach}
+
+File Path: {file_path}
+
+The styles should:
+1. Be well-organized and maintainable
+2. Follow {styling_approach} best practices
+3. Include responsive design (mobile, tablet, desktop)
+4. Use variables for colors, spacing, etc.
+5. Include base styles for common elements
+
+Implement the styles fully without placeholders.
+Only return the complete code for the file without any explanations.
+""")
+
+_SERVICE_PROMPT = PromptTemplate("frontend.service", """
+Act as an expert frontend developer.
+
+Create a service file for API communication based on the following details:
+
+Service Name: {service_name}
+Task Description: {description}
+Framework: {frontend_framework}
+
+File Path: {file_path}
+
+The service should:
+1. Handle API requests and responses
+2. Include error handling
+3. Use modern HTTP client (fetch, axios, etc.)
+4. Follow {frontend_framework} best practices
+5. Export functions for components to use
+
+Implement the service fully without placeholders.
+Only return the complete code for the file without any explanations.
+""")
+
+_GENERIC_PROMPT = PromptTemplate("frontend.generic", """
+Act as an expert frontend developer using {frontend_framework}.
+
+Create a frontend file based on the following details:
+
+Task Description: {description}
+File Type: {file_type}
+Framework: {frontend_framework}
+
+File Path: {file_path}
+
+The file should:
+1. Be well-structured and maintainable
+2. Follow {frontend_framework} best practices
+3. Include appropriate comments and documentation
+4. Implement the functionality described in the task
+
+Implement the file fully without placeholders.
+Only return the complete code for the file without any explanations.
+""")
+
+_PACKAGE_JSON_PROMPT = PromptTemplate("frontend.package_json", """
+Act as an expert frontend developer.
+
+Create a package.json file for a {frontend_framework} project with:
+1. Appropriate dependencies for {frontend_framework}
+2. Common development dependencies (webpack, babel, etc.)
+3. NPM scripts for development, building, testing
+4. Project metadata (name, version, description)
+
+Only return the complete JSON for package.json without any explanations.
+""")
+
+_INDEX_HTML_PROMPT = PromptTemplate("frontend.index_html", """
+Create a basic index.html file for a {frontend_framework} application.
+
+Only return the complete HTML without explanations.
+""")
+
+_CONFIG_FILES_PROMPT = PromptTemplate("frontend.config_files", """
+Act as an expert frontend developer.
+
+Create two files for a {frontend_framework} project:
+
+package.json with:
+1. Appropriate dependencies for {frontend_framework}
+2. Common development dependencies (webpack, babel, etc.)
+3. NPM scripts for development, building, testing
+4. Project metadata (name, version, description)
+
+public/index.html: a basic index.html file for a {frontend_framework} application.
+
+Respond with a JSON object with the keys "package.json" (the package.json content as a JSON object)
+and "public/index.html" (the complete HTML as a string), without markdown or explanations.
+""")
+
 class FrontendAgent:
     """
     Frontend Agent is responsible for:
@@ -29,15 +301,8 @@ class FrontendAgent:
         self.settings = settings
         self.file_manager = file_manager
         self.settings.setup_gemini()
-        self.model = genai.GenerativeModel(
-            model_name=self.settings.gemini_model,
-            generation_config={
-                "temperature": self.settings.gemini_temperature,
-                "top_p": self.settings.gemini_top_p,
-                "top_k": self.settings.gemini_top_k,
-                "max_output_tokens": self.settings.gemini_max_tokens,
-            }
-        )
+        self.model = get_model(self.settings)
+        self.llm = LLMClient(self.settings, self.model)
     
     async def implement_frontend(
         self,
@@ -52,23 +317,25 @@ class FrontendAgent:
         
         # Ensure frontend directory exists
         frontend_dir = os.path.join(self.settings.projects_root_dir, project_name, "frontend")
-        if not os.path.exists(frontend_dir):
-            os.makedirs(frontend_dir)
+        await asyncio.to_thread(os.makedirs, frontend_dir, exist_ok=True)
         
         results = {
             "completed_tasks": [],
             "created_files": []
         }
         
-        # Map priority to order of execution
-        priority_map = {"high": 0, "medium": 1, "low": 2}
+        # Sort tasks by priority so completed_tasks is reported in priority order
+        sorted_tasks = sorted(tasks, key=lambda t: _PRIORITY_ORDER.get(t.get("priority") or "medium", 1))
         
-        # Sort tasks by priority
-        sorted_tasks = sorted(tasks, key=lambda t: priority_map.get(t.get("priority", "medium"), 1))
+        # Tasks and config files are independent Gemini calls, so issue them concurrently;
+        # gather preserves input order, so completed_tasks keeps the priority order.
+        # A failure propagates, as in the backend agent, and fails the project.
+        *task_results, _ = await asyncio.gather(
+            *(self._process_task(project_name, task, architecture) for task in sorted_tasks),
+            self._create_config_files(project_name, architecture)
+        )
         
-        # Process tasks sequentially
-        for task in sorted_tasks:
-            task_result = await self._process_task(project_name, task, architecture)
+        for task, task_result in zip(sorted_tasks, task_results):
             results["completed_tasks"].append({
                 "task_id": task.get("task_id"),
                 "description": task.get("description"),
@@ -76,11 +343,8 @@ class FrontendAgent:
             })
             results["created_files"].extend(task_result.get("created_files", []))
         
-        # Create package.json and configuration files if not already created
-        await self._create_config_files(project_name, architecture)
-        
         # Save the results to a file
-        self.file_manager.write_json(project_name, "frontend/frontend_results.json", results)
+        await asyncio.to_thread(self.file_manager.write_json, project_name, "frontend/frontend_results.json", results)
         
         return results
     
@@ -97,31 +361,33 @@ class FrontendAgent:
         
         logger.info(f"Processing frontend task {task_id}: {description}")
         
+        # Lower-case the description and extract candidate names once for all handlers
+        description_lower = description.lower()
+        names = self._extract_named(description)
+        
         # Structure file generation based on task description
-        if "component" in description.lower():
-            return await self._generate_component(project_name, task, architecture)
-        elif "page" in description.lower():
-            return await self._generate_page(project_name, task, architecture)
-        elif "style" in description.lower():
-            return await self._generate_styles(project_name, task, architecture)
-        elif "service" in description.lower() or "api" in description.lower():
-            return await self._generate_service(project_name, task, architecture)
-        else:
+        handler_name = next(
+            (name for keyword, name in _TASK_HANDLERS if keyword in description_lower),
             # Generic frontend code generation
-            return await self._generate_generic_files(project_name, task, architecture)
+            "_generate_generic_files"
+        )
+        handler = getattr(self, handler_name)
+        return await handler(project_name, task, architecture, description_lower, names)
     
     async def _generate_component(
         self,
         project_name: str,
         task: Dict[str, Any],
-        architecture: Dict[str, Any]
+        architecture: Dict[str, Any],
+        description_lower: str,
+        names: List[Tuple[str, str]]
     ) -> Dict[str, Any]:
         """Generate a frontend component based on task description"""
         
         description = task.get("description", "")
         
         # Determine component name from task description
-        component_name = self._extract_component_name(description)
+        component_name = self._extract_component_name(names)
         file_structure = architecture.get("file_structure", {})
         
         # Get framework from architecture or use default
@@ -138,45 +404,14 @@ class FrontendAgent:
         else:
             file_paths = [f"src/components/{component_name}{extension}"]
         
-        created_files = []
-        
-        for file_path in file_paths:
-            prompt = f"""
-            Act as an expert frontend developer using {frontend_framework}.
-            
-            Create a {frontend_framework} component based on the following details:
-            
-            Component Name: {component_name}
-            Task Description: {description}
-            
-            File Path: {file_path}
-            
-            The component should:
-            1. Follow {frontend_framework} best practices
-            2. Be well-structured and maintainable
-            3. Include appropriate PropTypes/TypeScript types
-            4. Have clean, minimal styling
-            5. Include comments explaining complex logic
-            
-            Implement the component fully without placeholders.
-            Only return the complete code for the file without any explanations.
-            """
-            
-            response = await self.model.generate_content_async(prompt)
-            code = response.text.strip()
-            
-            # Clean up code (remove markdown code blocks if present)
-            if code.startswith("```") and code.endswith("```"):
-                code = "\n".join(code.split("\n")[1:-1])
-            
-            # Further clean up if language is specified
-            for lang in ["jsx", "vue", "typescript", "javascript", "html", "css"]:
-                if code.startswith(f"```{lang}") and code.endswith("```"):
-                    code = "\n".join(code.split("\n")[1:-1])
-            
-            # Write component file
-            self.file_manager.write_file(project_name, f"frontend/{file_path}", code)
-            created_files.append(file_path)
+        # All files of the component are requested in one call
+        created_files = await self._generate_files(
+            project_name,
+            file_paths,
+            _COMPONENT_PROMPT,
+            {"frontend_framework": frontend_framework, "component_name": component_name, "description": description},
+            identifier=component_name
+        )
         
         return {
             "component_name": component_name,
@@ -187,14 +422,16 @@ class FrontendAgent:
         self,
         project_name: str,
         task: Dict[str, Any],
-        architecture: Dict[str, Any]
+        architecture: Dict[str, Any],
+        description_lower: str,
+        names: List[Tuple[str, str]]
     ) -> Dict[str, Any]:
         """Generate a frontend page based on task description"""
         
         description = task.get("description", "")
         
         # Determine page name from task description
-        page_name = self._extract_page_name(description)
+        page_name = self._extract_page_name(names)
         
         # Get framework from architecture or use default
         frontend_framework = architecture.get("framework", "react")
@@ -210,56 +447,96 @@ class FrontendAgent:
         else:
             file_paths = [f"src/pages/{page_name}{extension}"]
         
-        created_files = []
-        
-        for file_path in file_paths:
-            prompt = f"""
-            Act as an expert frontend developer using {frontend_framework}.
-            
-            Create a {frontend_framework} page component based on the following details:
-            
-            Page Name: {page_name}
-            Task Description: {description}
-            
-            File Path: {file_path}
-            
-            The page should:
-            1. Follow {frontend_framework} best practices
-            2. Include layout elements (header, footer, main content)
-            3. Be responsive
-            4. Handle loading/error states if data fetching is involved
-            5. Include routing configuration if needed
-            
-            Implement the page fully without placeholders.
-            Only return the complete code for the file without any explanations.
-            """
-            
-            response = await self.model.generate_content_async(prompt)
-            code = response.text.strip()
-            
-            # Clean up code (remove markdown code blocks if present)
-            if code.startswith("```") and code.endswith("```"):
-                code = "\n".join(code.split("\n")[1:-1])
-            
-            # Further clean up if language is specified
-            for lang in ["jsx", "vue", "typescript", "javascript", "html", "css"]:
-                if code.startswith(f"```{lang}") and code.endswith("```"):
-                    code = "\n".join(code.split("\n")[1:-1])
-            
-            # Write page file
-            self.file_manager.write_file(project_name, f"frontend/{file_path}", code)
-            created_files.append(file_path)
+        # All files of the page are requested in one call
+        created_files = await self._generate_files(
+            project_name,
+            file_paths,
+            _PAGE_PROMPT,
+            {"frontend_framework": frontend_framework, "page_name": page_name, "description": description},
+            identifier=page_name
+        )
         
         return {
             "page_name": page_name,
             "created_files": created_files
         }
     
+    @staticmethod
+    def _file_prompt_parts(file_paths: List[str]) -> Tuple[str, str]:
+        """Return the file listing and output instruction for a prompt covering file_paths"""
+        
+        if len(file_paths) == 1:
+            return (
+                f"File Path: {file_paths[0]}",
+                "Only return the complete code for the file without any explanations."
+            )
+        
+        file_list = "\n".join(f"- {file_path}" for file_path in file_paths)
+        return (
+            f"File Paths:\n{file_list}",
+            "Respond with a JSON object mapping each file path to the complete code for that file, without markdown or explanations."
+        )
+    
+    async def _generate_files(
+        self,
+        project_name: str,
+        file_paths: List[str],
+        template: PromptTemplate,
+        values: Dict[str, Any],
+        identifier: Optional[str] = None
+    ) -> List[str]:
+        """
+        Generate and write file_paths with a single LLM call, filling template with
+        values plus the file listing and output instruction. A multi-file response is
+        parsed as a JSON object keyed by file path; any file missing from it is
+        generated on its own.
+        """
+        
+        def build_prompt(paths: List[str]) -> str:
+            file_section, output_instruction = self._file_prompt_parts(paths)
+            return template.format(**values, file_section=file_section, output_instruction=output_instruction)
+        
+        response_text = (await self.llm.generate(
+            build_prompt(file_paths),
+            identifier=identifier,
+            template_id=template.template_id,
+            json_only=len(file_paths) > 1
+        )).strip()
+        
+        if len(file_paths) == 1:
+            generated = {file_paths[0]: response_text}
+        else:
+            try:
+                generated = parse_json_string(json_utils.clean_json(response_text))
+            except ValueError:
+                generated = None
+            if not isinstance(generated, dict):
+                generated = {}
+        
+        missing = [file_path for file_path in file_paths if not isinstance(generated.get(file_path), str)]
+        if missing and len(file_paths) > 1:
+            logger.warning(f"Combined response omitted {missing}, generating them individually")
+            for file_path, code in zip(missing, await asyncio.gather(
+                *(self.llm.generate(build_prompt([file_path]), identifier=identifier, template_id=template.template_id)
+                  for file_path in missing)
+            )):
+                generated[file_path] = code.strip()
+        
+        # Clean up code (remove markdown code blocks if present)
+        await self._write_files(project_name, {
+            f"frontend/{file_path}": self._strip_code_fence(generated[file_path].strip())
+            for file_path in file_paths
+        })
+        
+        return list(file_paths)
+    
     async def _generate_styles(
         self,
         project_name: str,
         task: Dict[str, Any],
-        architecture: Dict[str, Any]
+        architecture: Dict[str, Any],
+        description_lower: str,
+        names: List[Tuple[str, str]]
     ) -> Dict[str, Any]:
         """Generate stylesheets based on task description"""
         
@@ -269,48 +546,26 @@ class FrontendAgent:
         frontend_framework = architecture.get("framework", "react")
         
         # Determine styling approach from description or use framework-specific default
-        styling_approach = "CSS" if "css" in description.lower() else "SCSS" if "scss" in description.lower() else "Tailwind" if "tailwind" in description.lower() else "CSS"
+        styling_approach = "CSS" if "css" in description_lower else "SCSS" if "scss" in description_lower else "Tailwind" if "tailwind" in description_lower else "CSS"
         
         # Define file path based on styling approach
         extension = ".scss" if styling_approach == "SCSS" else ".css"
         file_path = f"src/styles/main{extension}"
         
-        prompt = f"""
-        Act as an expert frontend stylist using {styling_approach}.
-        
-        Create styles based on the following details:
-        
-        Task Description: {description}
-        Framework: {frontend_framework}
-        Styling Approach: {styling_approach}
-        
-        File Path: {file_path}
-        
-        The styles should:
-        1. Be well-organized and maintainable
-        2. Follow {styling_approach} best practices
-        3. Include responsive design (mobile, tablet, desktop)
-        4. Use variables for colors, spacing, etc.
-        5. Include base styles for common elements
-        
-        Implement the styles fully without placeholders.
-        Only return the complete code for the file without any explanations.
-        """
+        prompt = _STYLES_PROMPT.format(
+            description=description,
+            frontend_framework=frontend_framework,
+            styling_approach=styling_approach,
+            file_path=file_path
+        )
         
-        response = await self.model.generate_content_async(prompt)
-        code = response.text.strip()
+        code = (await self.llm.generate(prompt)).strip()
         
         # Clean up code (remove markdown code blocks if present)
-        if code.startswith("```") and code.endswith("```"):
-            code = "\n".join(code.split("\n")[1:-1])
-        
-        # Further clean up if language is specified
-        for lang in ["css", "scss"]:
-            if code.startswith(f"```{lang}") and code.endswith("```"):
-                code = "\n".join(code.split("\n")[1:-1])
+        code = self._strip_code_fence(code)
         
         # Write stylesheet file
-        self.file_manager.write_file(project_name, f"frontend/{file_path}", code)
+        await self._write_files(project_name, {f"frontend/{file_path}": code})
         
         return {
             "styling_approach": styling_approach,
@@ -321,14 +576,16 @@ class FrontendAgent:
         self,
         project_name: str,
         task: Dict[str, Any],
-        architecture: Dict[str, Any]
+        architecture: Dict[str, Any],
+        description_lower: str,
+        names: List[Tuple[str, str]]
     ) -> Dict[str, Any]:
         """Generate a frontend service for API communication"""
         
         description = task.get("description", "")
         
         # Determine service name from task description
-        service_name = self._extract_service_name(description)
+        service_name = self._extract_service_name(names)
         
         # Get framework from architecture or use default
         frontend_framework = architecture.get("framework", "react")
@@ -337,42 +594,20 @@ class FrontendAgent:
         extension = ".js" if frontend_framework == "react" else ".ts" if frontend_framework == "angular" else ".js"
         file_path = f"src/services/{service_name}.service{extension}"
         
-        prompt = f"""
-        Act as an expert frontend developer.
-        
-        Create a service file for API communication based on the following details:
-        
-        Service Name: {service_name}
-        Task Description: {description}
-        Framework: {frontend_framework}
-        
-        File Path: {file_path}
-        
-        The service should:
-        1. Handle API requests and responses
-        2. Include error handling
-        3. Use modern HTTP client (fetch, axios, etc.)
-        4. Follow {frontend_framework} best practices
-        5. Export functions for components to use
-        
-        Implement the service fully without placeholders.
-        Only return the complete code for the file without any explanations.
-        """
+        prompt = _SERVICE_PROMPT.format(
+            service_name=service_name,
+            description=description,
+            frontend_framework=frontend_framework,
+            file_path=file_path
+        )
         
-        response = await self.model.generate_content_async(prompt)
-        code = response.text.strip()
+        code = (await self.llm.generate(prompt, identifier=service_name, template_id=_SERVICE_PROMPT.template_id)).strip()
         
         # Clean up code (remove markdown code blocks if present)
-        if code.startswith("```") and code.endswith("```"):
-            code = "\n".join(code.split("\n")[1:-1])
-        
-        # Further clean up if language is specified
-        for lang in ["javascript", "typescript"]:
-            if code.startswith(f"```{lang}") and code.endswith("```"):
-                code = "\n".join(code.split("\n")[1:-1])
+        code = self._strip_code_fence(code)
         
         # Write service file
-        self.file_manager.write_file(project_name, f"frontend/{file_path}", code)
+        await self._write_files(project_name, {f"frontend/{file_path}": code})
         
         return {
             "service_name": service_name,
@@ -383,14 +618,16 @@ class FrontendAgent:
         self,
         project_name: str,
         task: Dict[str, Any],
-        architecture: Dict[str, Any]
+        architecture: Dict[str, Any],
+        description_lower: str,
+        names: List[Tuple[str, str]]
     ) -> Dict[str, Any]:
         """Generate generic frontend files based on task description"""
         
         description = task.get("description", "")
         
         # Try to determine the most likely file type from description
-        file_type = "utility" if "util" in description.lower() else "component" if "component" in description.lower() else "config" if "config" in description.lower() else "misc"
+        file_type = "utility" if "util" in description_lower else "component" if "component" in description_lower else "config" if "config" in description_lower else "misc"
         
         # Get framework from architecture or use default
         frontend_framework = architecture.get("framework", "react")
@@ -407,41 +644,20 @@ class FrontendAgent:
                 if potential_path and not potential_path.startswith("/"):
                     file_path = potential_path
         
-        prompt = f"""
-        Act as an expert frontend developer using {frontend_framework}.
-        
-        Create a frontend file based on the following details:
-        
-        Task Description: {description}
-        File Type: {file_type}
-        Framework: {frontend_framework}
-        
-        File Path: {file_path}
-        
-        The file should:
-        1. Be well-structured and maintainable
-        2. Follow {frontend_framework} best practices
-        3. Include appropriate comments and documentation
-        4. Implement the functionality described in the task
-        
-        Implement the file fully without placeholders.
-        Only return the complete code for the file without any explanations.
-        """
+        prompt = _GENERIC_PROMPT.format(
+            description=description,
+            file_type=file_type,
+            frontend_framework=frontend_framework,
+            file_path=file_path
+        )
         
-        response = await self.model.generate_content_async(prompt)
-        code = response.text.strip()
+        code = (await self.llm.generate(prompt)).strip()
         
         # Clean up code (remove markdown code blocks if present)
-        if code.startswith("```") and code.endswith("```"):
-            code = "\n".join(code.split("\n")[1:-1])
-        
-        # Further clean up if language is specified
-        for lang in ["javascript", "typescript", "jsx", "tsx"]:
-            if code.startswith(f"```{lang}") and code.endswith("```"):
-                code = "\n".join(code.split("\n")[1:-1])
+        code = self._strip_code_fence(code)
         
         # Write file
-        self.file_manager.write_file(project_name, f"frontend/{file_path}", code)
+        await self._write_files(project_name, {f"frontend/{file_path}": code})
         
         return {
             "file_type": file_type,
@@ -461,39 +677,31 @@ class FrontendAgent:
         # Create package.json
         package_json_path = "package.json"
         
-        prompt = f"""
-        Act as an expert frontend developer.
-        
-        Create a package.json file for a {frontend_framework} project with:
-        1. Appropriate dependencies for {frontend_framework}
-        2. Common development dependencies (webpack, babel, etc.)
-        3. NPM scripts for development, building, testing
-        4. Project metadata (name, version, description)
-        
-        Only return the complete JSON for package.json without any explanations.
-        """
-        
-        response = await self.model.generate_content_async(prompt)
-        package_json = response.text.strip()
-        
-        # Clean up code (remove markdown code blocks if present)
-        if package_json.startswith("```") and package_json.endswith("```"):
-            package_json = "\n".join(package_json.split("\n")[1:-1])
-        
-        if package_json.startswith("```json") and package_json.endswith("```"):
-            package_json = "\n".join(package_json.split("\n")[1:-1])
-        
-        # Update project name in package.json
-        try:
-            package_data = json.loads(package_json)
-            package_data["name"] = project_name.lower().replace(" ", "-")
-            package_json = json.dumps(package_data, indent=2)
-        except:
-            # If parsing fails, proceed with the original
-            pass
+        if not self.settings.llm_generated_config and frontend_framework in _PACKAGE_JSON_TEMPLATES:
+            # Known frameworks get static templates; no LLM round-trip needed
+            package_data = {
+                **_PACKAGE_JSON_TEMPLATES[frontend_framework],
+                "name": project_name.lower().replace(" ", "-")
+            }
+            package_json = json_utils.dumps(package_data, indent=True)
+            index_html = _INDEX_HTML_TEMPLATE.format(
+                title=html.escape(project_name),
+                mount_point=_INDEX_HTML_MOUNT_POINTS[frontend_framework]
+            )
+        else:
+            package_json, index_html = await self._generate_config_with_llm(frontend_framework)
+            
+            # Update project name in package.json
+            try:
+                package_data = json_utils.loads(package_json)
+                package_data["name"] = project_name.lower().replace(" ", "-")
+                package_json = json_utils.dumps(package_data, indent=True)
+            except (ValueError, TypeError):
+                # If parsing fails, proceed with the original
+                pass
         
         # Write package.json file
-        self.file_manager.write_file(project_name, f"frontend/{package_json_path}", package_json)
+        config_files = {f"frontend/{package_json_path}": package_json}
         
         # Create framework-specific config files
         if frontend_framework == "react":
@@ -507,7 +715,7 @@ class FrontendAgent:
     "@babel/plugin-transform-runtime"
   ]
 }"""
-            self.file_manager.write_file(project_name, "frontend/.babelrc", babel_config)
+            config_files["frontend/.babelrc"] = babel_config
             
         elif frontend_framework == "vue":
             # Create vue.config.js
@@ -519,7 +727,7 @@ class FrontendAgent:
     sourceMap: true
   }
 }"""
-            self.file_manager.write_file(project_name, "frontend/vue.config.js", vue_config)
+            config_files["frontend/vue.config.js"] = vue_config
             
         elif frontend_framework == "angular":
             # Create angular.json (simplified)
@@ -556,74 +764,109 @@ class FrontendAgent:
   },
   "defaultProject": "app"
 }"""
-            self.file_manager.write_file(project_name, "frontend/angular.json", angular_config)
+            config_files["frontend/angular.json"] = angular_config
         
-        # Create index.html
-        index_html_prompt = f"""
-        Create a basic index.html file for a {frontend_framework} application.
+        config_files["frontend/public/index.html"] = index_html
         
-        Only return the complete HTML without explanations.
-        """
+        await self._write_files(project_name, config_files)
+    
+    async def _generate_config_with_llm(self, frontend_framework: str) -> Tuple[str, str]:
+        """Ask Gemini for package.json and index.html, returning both as cleaned text"""
         
-        response = await self.model.generate_content_async(index_html_prompt)
-        index_html = response.text.strip()
+        # Request package.json and index.html in one call
+        combined_prompt = _CONFIG_FILES_PROMPT.format(frontend_framework=frontend_framework)
         
-        # Clean up code
-        if index_html.startswith("```html") and index_html.endswith("```"):
-            index_html = "\n".join(index_html.split("\n")[1:-1])
-        elif index_html.startswith("```") and index_html.endswith("```"):
-            index_html = "\n".join(index_html.split("\n")[1:-1])
+        combined_text = (await self.llm.generate(combined_prompt, json_only=True)).strip()
+        try:
+            combined_files = parse_json_string(json_utils.clean_json(combined_text))
+        except ValueError:
+            combined_files = None
+        if not isinstance(combined_files, dict):
+            combined_files = {}
+        
+        package_json = combined_files.get("package.json")
+        if isinstance(package_json, dict):
+            package_json = json_utils.dumps(package_json)
+        index_html = combined_files.get("public/index.html")
+        
+        # Fall back to the single-file prompts for anything the combined response lacks
+        if not isinstance(package_json, str):
+            package_json = await self.llm.generate(
+                _PACKAGE_JSON_PROMPT.format(frontend_framework=frontend_framework)
+            )
+        if not isinstance(index_html, str):
+            index_html = await self.llm.generate(
+                _INDEX_HTML_PROMPT.format(frontend_framework=frontend_framework)
+            )
         
-        self.file_manager.write_file(project_name, "frontend/public/index.html", index_html)
+        # Clean up code (remove markdown code blocks if present)
+        return self._strip_code_fence(package_json.strip()), self._strip_code_fence(index_html.strip())
     
-    def _extract_component_name(self, description: str) -> str:
-        """Extract component name from task description"""
-        
-        # Try to find component name in the description
-        words = description.split()
-        component_name = "DefaultComponent"
-        
-        for i, word in enumerate(words):
-            if word.lower() in ["component", "widget", "element"]:
-                if i > 0:
-                    component_name = words[i-1]
-                    # Capitalize first letter
-                    component_name = component_name[0].upper() + component_name[1:]
-                    # Remove any non-alphanumeric characters
-                    component_name = ''.join(c for c in component_name if c.isalnum())
-        
-        return component_name
+    async def _write_files(self, project_name: str, files: Dict[str, str]) -> None:
+        """
+        Write a mapping of relative path to content concurrently in worker threads.
+        Parent directories are created up front in one pass, so concurrent writes
+        never race to create the same directory.
+        """
+        
+        project_dir = os.path.join(self.settings.projects_root_dir, project_name)
+        dirs = {os.path.dirname(os.path.join(project_dir, path)) for path in files}
+        await asyncio.to_thread(self._make_dirs, dirs)
+        
+        await asyncio.gather(*(
+            asyncio.to_thread(self.file_manager.write_file, project_name, path, content)
+            for path, content in files.items()
+        ))
     
-    def _extract_page_name(self, description: str) -> str:
-        """Extract page name from task description"""
-        
-        # Try to find page name in the description
-        words = description.split()
-        page_name = "DefaultPage"
-        
-        for i, word in enumerate(words):
-            if word.lower() in ["page", "screen", "view"]:
-                if i > 0:
-                    page_name = words[i-1]
-                    # Capitalize first letter
-                    page_name = page_name[0].upper() + page_name[1:]
-                    # Remove any non-alphanumeric characters
-                    page_name = ''.join(c for c in page_name if c.isalnum())
-        
-        return page_name
+    @staticmethod
+    def _make_dirs(dirs: Set[str]) -> None:
+        """Create each directory (and its parents) in a single blocking pass"""
+        
+        for d in dirs:
+            os.makedirs(d, exist_ok=True)
     
-    def _extract_service_name(self, description: str) -> str:
-        """Extract service name from task description"""
+    @staticmethod
+    def _strip_code_fence(text: str) -> str:
+        """Remove a surrounding markdown code block, if present"""
         
-        # Try to find service name in the description
-        words = description.split()
-        service_name = "api"
+        match = _FENCE_RE.match(text)
+        return match.group(1) if match else text
+    
+    @staticmethod
+    def _extract_named(description: str) -> List[Tuple[str, str]]:
+        """Return every (name, keyword) pair in the description, e.g. ("Header", "component")"""
         
-        for i, word in enumerate(words):
-            if word.lower() in ["service", "api", "client"]:
-                if i > 0:
-                    service_name = words[i-1].lower()
-                    # Remove any non-alphanumeric characters
-                    service_name = ''.join(c for c in service_name if c.isalnum() or c == '-')
+        return [(name, kind.lower()) for name, kind in _NAME_RE.findall(description)]
+    
+    @staticmethod
+    def _last_named(names: List[Tuple[str, str]], kinds: Tuple[str, ...]) -> Optional[str]:
+        """Return the name before the last keyword of the given kinds, if any"""
         
-        return service_name
\ No newline at end of file
+        return next((name for name, kind in reversed(names) if kind in kinds), None)
+    
+    def _extract_component_name(self, names: List[Tuple[str, str]]) -> str:
+        """Extract component name from the names found in a task description"""
+        
+        component_name = self._last_named(names, _COMPONENT_KINDS)
+        if component_name is None:
+            return "DefaultComponent"
+        # Capitalize first letter and remove any non-alphanumeric characters
+        return _NON_ALNUM_RE.sub("", component_name[0].upper() + component_name[1:])
+    
+    def _extract_page_name(self, names: List[Tuple[str, str]]) -> str:
+        """Extract page name from the names found in a task description"""
+        
+        page_name = self._last_named(names, _PAGE_KINDS)
+        if page_name is None:
+            return "DefaultPage"
+        # Capitalize first letter and remove any non-alphanumeric characters
+        return _NON_ALNUM_RE.sub("", page_name[0].upper() + page_name[1:])
+    
+    def _extract_service_name(self, names: List[Tuple[str, str]]) -> str:
+        """Extract service name from the names found in a task description"""
+        
+        service_name = self._last_named(names, _SERVICE_KINDS)
+        if service_name is None:
+            return "api"
+        # Remove any non-alphanumeric characters other than hyphens
+        return _NON_ALNUM_OR_HYPHEN_RE.sub("", service_name.lower())
@@ -3,19 +3,410 @@ Vibe Coding System - Project Manager Agent
 The central coordinator for the entire system
 """
 
-import os
-import json
+import string
+import contextlib
+import hashlib
 import logging
 import google.generativeai as genai
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Awaitable, Dict, List, Any, Optional, Tuple
 import asyncio
+from pathlib import Path, PurePosixPath
 
+from core import json_utils
 from core.config import Settings
 from core.file_manager import FileManager
-from core.utils import clean_json_string, parse_json_string
+from core.llm_cache import FileCache
+from core.llm_client import LLMClient, get_model
+from core.utils import parse_json_string
 
 logger = logging.getLogger(__name__)
 
+# Prompts put their static instructions and schema first and append the
+# per-project details (filled in from the *_DETAILS templates), so repeated
+# calls share the longest possible prefix
+_PLAN_PROMPT = """
+Act as an expert Project Manager for a software development team.
+
+I need a detailed project plan for a software application. The project details
+are given at the end of this prompt.
+
+Create a comprehensive project plan with the following components:
+
+1. Project Overview - A brief summary of the project
+2. Core Features - List of key features to be implemented
+3. Technical Stack - Detailed breakdown of the technologies to be used
+4. Frontend Tasks - Specific tasks for the frontend agent
+5. Backend Tasks - Specific tasks for the backend agent
+6. AI Tasks (if applicable) - Specific tasks for the AI agent
+7. Documentation Requirements - What should be documented
+
+Return your response as a JSON object with the following structure:
+
+```json
+{
+    "project_overview": "string",
+    "core_features": ["string"],
+    "technical_stack": {
+        "frontend": ["string"],
+        "backend": ["string"],
+        "database": ["string"],
+        "ai": ["string"],  // Only if include_ai is true
+        "deployment": ["string"]
+    },
+    "frontend_tasks": [
+        {
+            "task_id": "string",
+            "description": "string",
+            "priority": "high|medium|low",
+            "dependencies": ["task_id"]  // Optional
+        }
+    ],
+    "backend_tasks": [
+        {
+            "task_id": "string",
+            "description": "string",
+            "priority": "high|medium|low",
+            "dependencies": ["task_id"]  // Optional
+        }
+    ],
+    "ai_tasks": [  // Only if include_ai is true
+        {
+            "task_id": "string",
+            "description": "string",
+            "priority": "high|medium|low",
+            "dependencies": ["task_id"]  // Optional
+        }
+    ],
+    "documentation_requirements": ["string"]
+}
+```
+
+Be specific, detailed, and practical in your task descriptions.
+"""
+
+_PLAN_DETAILS = string.Template("""
+Project Details:
+Project Name: ${project_name}
+Description: ${description}
+Frontend Framework: ${frontend_framework}
+Backend Framework: ${backend_framework}
+Database: ${database}
+Include AI Components: ${include_ai}
+Deployment Target: ${deployment_target}
+""")
+
+_CUSTOMIZE_PLAN_PROMPT = """
+Act as an expert Project Manager for a software development team.
+
+The project plan at the end of this prompt was written for another application
+built on the same technical stack. Customize it for the project described just
+before it, rewriting the overview, features and tasks to match its description
+while keeping the technical stack and JSON structure.
+
+Return only the customized project plan as a JSON object with the same structure.
+"""
+
+_CUSTOMIZE_PLAN_DETAILS = string.Template("""
+Project Name: ${project_name}
+Description: ${description}
+
+Project Plan:
+${project_plan}
+""")
+
+_ARCHITECTURE_PROMPT = """
+Act as an expert Software Architect. Based on the project plan given at the end
+of this prompt, create a detailed system architecture.
+
+Create a comprehensive architecture document with the following components:
+
+1. System Overview - Overall architectural approach
+2. Component Diagram - Description of main components and their interactions
+3. Data Flow - How data moves through the system
+4. Frontend Architecture - Component structure, state management, routing
+5. Backend Architecture - API structure, service layers, middleware
+6. Database Schema - Tables/collections, relationships, indexes
+7. AI Components (if applicable) - Machine learning models, data pipelines
+8. Deployment Architecture - Container strategy, services, scaling
+
+Return your response as a JSON object with the following structure:
+
+```json
+{
+    "system_overview": "string",
+    "components": [
+        {
+            "name": "string",
+            "description": "string",
+            "responsibilities": ["string"]
+        }
+    ],
+    "data_flow": [
+        {
+            "step": "string",
+            "description": "string",
+            "from_component": "string",
+            "to_component": "string",
+            "data": "string"
+        }
+    ],
+    "frontend": {
+        "components": ["string"],
+        "state_management": "string",
+        "routing": "string",
+        "api_integration": "string",
+        "file_structure": {
+            "directory_name": "string",
+            "description": "string",
+            "files": [
+                {
+                    "file_name": "string",
+                    "description": "string"
+                }
+            ],
+            "subdirectories": [
+                // Recursive structure of the same form
+            ]
+        }
+    },
+    "backend": {
+        "api_structure": ["string"],
+        "services": ["string"],
+        "middleware": ["string"],
+        "file_structure": {
+            "directory_name": "string",
+            "description": "string",
+            "files": [
+                {
+                    "file_name": "string",
+                    "description": "string"
+                }
+            ],
+            "subdirectories": [
+                // Recursive structure of the same form
+            ]
+        }
+    },
+    "database": {
+        "schema": [
+            {
+                "table_name": "string",
+                "description": "string",
+                "fields": [
+                    {
+                        "name": "string",
+                        "type": "string",
+                        "description": "string",
+                        "constraints": ["string"]
+                    }
+                ],
+                "relationships": [
+                    {
+                        "related_table": "string",
+                        "type": "string",
+                        "through": "string"  // For many-to-many
+                    }
+                ]
+            }
+        ]
+    },
+    "ai": { // Only if AI components are included
+        "models": [
+            {
+                "name": "string",
+                "purpose": "string",
+                "inputs": ["string"],
+                "outputs": ["string"],
+                "training_data": "string"
+            }
+        ],
+        "data_pipelines": [
+            {
+                "name": "string",
+                "description": "string",
+                "steps": ["string"]
+            }
+        ],
+        "file_structure": {
+            "directory_name": "string",
+            "description": "string",
+            "files": [
+                {
+                    "file_name": "string",
+                    "description": "string"
+                }
+            ],
+            "subdirectories": [
+                // Recursive structure of the same form
+            ]
+        }
+    },
+    "deployment": {
+        "containers": ["string"],
+        "services": ["string"],
+        "infrastructure": ["string"],
+        "scaling_strategy": "string",
+        "file_structure": {
+            "directory_name": "string",
+            "description": "string",
+            "files": [
+                {
+                    "file_name": "string",
+                    "description": "string"
+                }
+            ]
+        }
+    }
+}
+```
+
+Be specific and ensure the architecture is implementable with the specified technologies.
+Focus on practical file structures that our agents can create.
+"""
+
+# Project plan fields passed to the architecture prompt
+_ARCHITECTURE_PLAN_FIELDS = (
+    "project_overview",
+    "core_features",
+    "technical_stack",
+    "frontend_tasks",
+    "backend_tasks",
+    "ai_tasks",
+)
+
+_ARCHITECTURE_DETAILS = string.Template("""
+Project Plan:
+${project_plan}
+""")
+
+# Separates the plan from the architecture in a combined plan-and-architecture response
+_ARCHITECTURE_DELIMITER = "===ARCH==="
+
+_PLAN_AND_ARCHITECTURE_PROMPT = f"""
+You will produce two JSON documents for the software project whose details are given
+at the end of this prompt: first its project plan, then its system architecture.
+Return the project plan, then a line containing only {_ARCHITECTURE_DELIMITER}, then the
+architecture. Wherever the architecture instructions refer to the project plan, use
+the plan you produced.
+
+PART 1 - PROJECT PLAN
+{_PLAN_PROMPT}
+PART 2 - ARCHITECTURE
+{_ARCHITECTURE_PROMPT}"""
+
+# Fast path for small projects: plan, architecture, code and docs from one call
+_FULLSTACK_BUNDLE_PROMPT = """
+Act as a senior full-stack engineer delivering a small software project on your own.
+The project details are given at the end of this prompt.
+
+Plan the project, design its architecture, and write all of its source code and
+documentation. Keep the application small: only the files it needs to run.
+
+Return your response as a single JSON object with the following structure:
+
+```json
+{
+    "project_plan": {
+        "project_overview": "string",
+        "core_features": ["string"],
+        "technical_stack": {
+            "frontend": ["string"],
+            "backend": ["string"],
+            "database": ["string"],
+            "deployment": ["string"]
+        },
+        "frontend_tasks": [
+            {"task_id": "string", "description": "string", "priority": "high|medium|low"}
+        ],
+        "backend_tasks": [
+            {"task_id": "string", "description": "string", "priority": "high|medium|low"}
+        ],
+        "documentation_requirements": ["string"]
+    },
+    "architecture": {
+        "system_overview": "string",
+        "frontend": {"components": ["string"], "state_management": "string", "routing": "string"},
+        "backend": {"api_structure": ["string"], "services": ["string"], "middleware": ["string"]},
+        "database": {"schema": ["string"]},
+        "deployment": {"containers": ["string"], "services": ["string"]}
+    },
+    "files": {
+        "frontend/path/to/file": "complete file contents",
+        "backend/path/to/file": "complete file contents",
+        "docs/path/to/file": "complete file contents"
+    }
+}
+```
+
+Every file path must be relative and start with frontend/, backend/ or docs/.
+Write complete, working code; do not leave placeholders.
+"""
+
+# Directories the fast path may write files into
+_BUNDLE_FILE_ROOTS = ("frontend", "backend", "docs")
+
+_FINAL_REPORT_PROMPT = """
+Act as a Project Manager conducting a final review of a completed software project.
+
+The project has been completed. Its name, ID and the files generated are given at the
+end of this prompt.
+
+Based on the original project plan and architecture, create a final project report with the following:
+
+1. Executive Summary - Brief overview of what was accomplished
+2. Features Implemented - List of features successfully implemented
+3. Technical Overview - Brief description of the technical stack used
+4. Project Structure - Overview of the directory structure
+5. Setup Instructions - How to set up and run the project
+6. Next Steps - Recommendations for future development
+
+Return your response as a JSON object with the following structure:
+
+```json
+{
+    "executive_summary": "string",
+    "features_implemented": ["string"],
+    "technical_overview": "string",
+    "project_structure": "string",
+    "setup_instructions": "string",
+    "next_steps": ["string"]
+}
+```
+
+Be concise but comprehensive in your report.
+"""
+
+_FINAL_REPORT_DETAILS = string.Template("""
+Project Name: ${project_name}
+Project ID: ${project_id}
+
+Files Generated:
+${files}
+""")
+
+# README.md generated from the final report, filled in with str.format_map
+_README_TEMPLATE = """# {project_name}
+
+## Executive Summary
+{executive_summary}
+
+## Features Implemented
+{features_implemented}
+
+## Technical Overview
+{technical_overview}
+
+## Project Structure
+{project_structure}
+
+## Setup Instructions
+{setup_instructions}
+
+## Next Steps
+{next_steps}
+
+"""
+
 class ProjectManagerAgent:
     """
     Project Manager Agent is responsible for:
@@ -30,16 +421,31 @@ class ProjectManagerAgent:
         self.settings = settings
         self.file_manager = file_manager
         self.settings.setup_gemini()
-        self.model = genai.GenerativeModel(
-            model_name=self.settings.gemini_model,
-            generation_config={
-                "temperature": self.settings.gemini_temperature,
-                "top_p": self.settings.gemini_top_p,
-                "top_k": self.settings.gemini_top_k,
-                "max_output_tokens": self.settings.gemini_max_tokens,
-            }
-        )
+        self.model = get_model(self.settings)
+        # Gemini calls go through the shared response cache and dispatcher, whose
+        # worker pool bounds concurrent calls, e.g. when plans are created in batch
+        self.llm = LLMClient(self.settings, self.model)
+        self.projects_root = Path(self.settings.projects_root_dir)
+        # Project directories this agent has already created
+        self._project_dirs: Dict[str, Path] = {}
+        # Generated plans keyed by technical stack, reused as templates for new projects
+        self._template_cache: Optional[FileCache] = None
+        if self.settings.plan_template_cache_enabled:
+            self._template_cache = FileCache(
+                self.settings.plan_template_cache_dir,
+                self.settings.llm_cache_ttl_seconds
+            )
+        
+    async def _cached_generate(self, prompt: str, static_prefix: Optional[str] = None) -> str:
+        """
+        Return the JSON document in Gemini's response to the prompt, served from the
+        LLM cache when possible. Streaming stops as soon as the document is complete.
+        static_prefix is the prompt's static instructions, which may be sent as
+        Gemini cached content.
+        """
         
+        return await self.llm.generate(prompt, json_only=True, static_prefix=static_prefix)
+    
     async def create_project_plan(
         self,
         project_id: str,
@@ -55,265 +461,372 @@ class ProjectManagerAgent:
         
         logger.info(f"Creating project plan for {project_name}")
         
-        prompt = f"""
-        Act as an expert Project Manager for a software development team.
-        
-        I need a detailed project plan for a software application with the following details:
-        
-        Project Name: {project_name}
-        Description: {description}
-        Frontend Framework: {frontend_framework}
-        Backend Framework: {backend_framework}
-        Database: {database}
-        Include AI Components: {"Yes" if include_ai else "No"}
-        Deployment Target: {deployment_target}
-        
-        Create a comprehensive project plan with the following components:
-        
-        1. Project Overview - A brief summary of the project
-        2. Core Features - List of key features to be implemented
-        3. Technical Stack - Detailed breakdown of the technologies to be used
-        4. Frontend Tasks - Specific tasks for the frontend agent
-        5. Backend Tasks - Specific tasks for the backend agent
-        6. AI Tasks (if applicable) - Specific tasks for the AI agent
-        7. Documentation Requirements - What should be documented
-        
-        Return your response as a JSON object with the following structure:
-        
-        ```json
-        {{
-            "project_overview": "string",
-            "core_features": ["string"],
-            "technical_stack": {{
-                "frontend": ["string"],
-                "backend": ["string"],
-                "database": ["string"],
-                "ai": ["string"],  // Only if include_ai is true
-                "deployment": ["string"]
-            }},
-            "frontend_tasks": [
-                {{
-                    "task_id": "string",
-                    "description": "string",
-                    "priority": "high|medium|low",
-                    "dependencies": ["task_id"]  // Optional
-                }}
-            ],
-            "backend_tasks": [
-                {{
-                    "task_id": "string",
-                    "description": "string",
-                    "priority": "high|medium|low",
-                    "dependencies": ["task_id"]  // Optional
-                }}
-            ],
-            "ai_tasks": [  // Only if include_ai is true
-                {{
-                    "task_id": "string",
-                    "description": "string",
-                    "priority": "high|medium|low",
-                    "dependencies": ["task_id"]  // Optional
-                }}
-            ],
-            "documentation_requirements": ["string"]
-        }}
-        ```
-        
-        Be specific, detailed, and practical in your task descriptions.
-        """
+        prompt = _PLAN_PROMPT + _PLAN_DETAILS.substitute(
+            project_name=project_name,
+            description=description,
+            frontend_framework=frontend_framework,
+            backend_framework=backend_framework,
+            database=database,
+            include_ai="Yes" if include_ai else "No",
+            deployment_target=deployment_target
+        )
         
-        response = await self.model.generate_content_async(prompt)
-        response_text = response.text
+        # Adapt a cached plan for the same stack if there is one, which needs a much
+        # shorter prompt than generating the plan from scratch
+        template_key = (frontend_framework, backend_framework, database, include_ai, deployment_target)
+        project_plan = await self._customize_plan_template(template_key, project_name, description)
         
-        # Extract and parse JSON from response
-        json_string = clean_json_string(response_text)
-        project_plan = parse_json_string(json_string)
+        if project_plan is None:
+            response_text = await self._cached_generate(prompt, _PLAN_PROMPT)
+            
+            # Extract and parse JSON from response
+            json_string = json_utils.clean_json(response_text)
+            project_plan = parse_json_string(json_string)
+            
+            await self._store_plan_template(template_key, project_plan)
         
         # Save the project plan to a file
-        project_dir = os.path.join(self.settings.projects_root_dir, project_name)
-        if not os.path.exists(project_dir):
-            os.makedirs(project_dir)
-            
-        self.file_manager.write_json(project_name, "project_plan.json", project_plan)
+        await self._ensure_project_dir(project_name)
+        
+        await asyncio.to_thread(self.file_manager.write_json, project_name, "project_plan.json", project_plan)
         
         return project_plan
     
+    async def stream_plan_and_architecture(
+        self,
+        project_id: str,
+        project_name: str,
+        description: str,
+        frontend_framework: str,
+        backend_framework: str,
+        database: str,
+        include_ai: bool,
+        deployment_target: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Create the project plan and the architecture with a single streamed Gemini
+        call, yielding partial results as soon as they parse: {"project_plan": plan}
+        once the plan is complete, then {"architecture": {section: value}} as each
+        top-level architecture section (frontend, backend, ...) closes. If the
+        response has no architecture section, the architecture is created from the
+        plan with a second call and yielded whole.
+        """
+        
+        logger.info(f"Creating project plan and architecture for {project_name}")
+        
+        prompt = _PLAN_AND_ARCHITECTURE_PROMPT + _PLAN_DETAILS.substitute(
+            project_name=project_name,
+            description=description,
+            frontend_framework=frontend_framework,
+            backend_framework=backend_framework,
+            database=database,
+            include_ai="Yes" if include_ai else "No",
+            deployment_target=deployment_target
+        )
+        
+        response_text = ""
+        project_plan: Optional[Dict[str, Any]] = None
+        plan_scanner = json_utils.JSONDocumentScanner()
+        architecture_scanner: Optional[json_utils.JSONDocumentScanner] = None
+        sent_sections: Dict[str, Any] = {}
+        parsed_members = 0
+        
+        async with contextlib.aclosing(
+            self.llm.stream(prompt, static_prefix=_PLAN_AND_ARCHITECTURE_PROMPT)
+        ) as chunks:
+            async for chunk in chunks:
+                response_text += chunk
+                if project_plan is None:
+                    if not plan_scanner.feed(chunk):
+                        continue
+                    project_plan = parse_json_string(plan_scanner.document)
+                    yield {"project_plan": project_plan}
+                
+                if architecture_scanner is None:
+                    _, found, architecture_text = response_text.partition(_ARCHITECTURE_DELIMITER)
+                    if not found:
+                        continue
+                    architecture_scanner = json_utils.JSONDocumentScanner()
+                    architecture_scanner.feed(architecture_text)
+                else:
+                    architecture_scanner.feed(chunk)
+                
+                # Sections that do not parse on their own are picked up from the
+                # full architecture below
+                for member in architecture_scanner.members[parsed_members:]:
+                    try:
+                        section = json_utils.loads("{" + member + "}")
+                    except ValueError:
+                        continue
+                    sent_sections.update(section)
+                    yield {"architecture": section}
+                parsed_members = len(architecture_scanner.members)
+        
+        plan_text, _, architecture_text = response_text.partition(_ARCHITECTURE_DELIMITER)
+        if project_plan is None:
+            project_plan = parse_json_string(json_utils.clean_json(plan_text))
+            yield {"project_plan": project_plan}
+        
+        template_key = (frontend_framework, backend_framework, database, include_ai, deployment_target)
+        await self._store_plan_template(template_key, project_plan)
+        
+        await self._ensure_project_dir(project_name)
+        
+        if not architecture_text.strip():
+            logger.warning(f"No architecture in combined response for {project_name}, requesting it separately")
+            await asyncio.to_thread(self.file_manager.write_json, project_name, "project_plan.json", project_plan)
+            architecture = await self.create_architecture(project_id, project_plan, project_name)
+            yield {"architecture": architecture}
+            return
+        
+        architecture = parse_json_string(json_utils.clean_json(architecture_text))
+        
+        # Save the project plan and architecture
+        await asyncio.gather(
+            asyncio.to_thread(self.file_manager.write_json, project_name, "project_plan.json", project_plan),
+            asyncio.to_thread(self.file_manager.write_json, project_name, "architecture.json", architecture)
+        )
+        
+        remaining = {name: section for name, section in architecture.items() if name not in sent_sections}
+        if remaining:
+            yield {"architecture": remaining}
+    
+    async def create_plan_and_architecture(
+        self,
+        project_id: str,
+        project_name: str,
+        description: str,
+        frontend_framework: str,
+        backend_framework: str,
+        database: str,
+        include_ai: bool,
+        deployment_target: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Create the project plan and the architecture with a single Gemini call,
+        saving one round-trip per project. Collects stream_plan_and_architecture.
+        """
+        
+        project_plan: Dict[str, Any] = {}
+        architecture: Dict[str, Any] = {}
+        async for partial in self.stream_plan_and_architecture(
+            project_id=project_id,
+            project_name=project_name,
+            description=description,
+            frontend_framework=frontend_framework,
+            backend_framework=backend_framework,
+            database=database,
+            include_ai=include_ai,
+            deployment_target=deployment_target
+        ):
+            project_plan.update(partial.get("project_plan", {}))
+            architecture.update(partial.get("architecture", {}))
+        return project_plan, architecture
+    
+    async def generate_fullstack_bundle(
+        self,
+        project_id: str,
+        project_name: str,
+        description: str,
+        frontend_framework: str,
+        backend_framework: str,
+        database: str,
+        deployment_target: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fast path for small projects without AI components: get the plan,
+        architecture, source files and documentation from a single Gemini call and
+        save them where the agents would. Returns the bundle, or None (having saved
+        nothing) if the response does not have the expected shape.
+        """
+        
+        logger.info(f"Generating full-stack bundle for {project_name}")
+        
+        prompt = _FULLSTACK_BUNDLE_PROMPT + _PLAN_DETAILS.substitute(
+            project_name=project_name,
+            description=description,
+            frontend_framework=frontend_framework,
+            backend_framework=backend_framework,
+            database=database,
+            include_ai="No",
+            deployment_target=deployment_target
+        )
+        
+        response_text = await self._cached_generate(prompt, _FULLSTACK_BUNDLE_PROMPT)
+        try:
+            bundle = parse_json_string(json_utils.clean_json(response_text))
+        except ValueError:
+            return None
+        if not self._is_valid_bundle(bundle):
+            logger.warning(f"Full-stack bundle for {project_name} is incomplete or has unsafe file paths")
+            return None
+        
+        await self._ensure_project_dir(project_name)
+        await asyncio.gather(
+            asyncio.to_thread(self.file_manager.write_json, project_name, "project_plan.json", bundle["project_plan"]),
+            asyncio.to_thread(self.file_manager.write_json, project_name, "architecture.json", bundle["architecture"]),
+            *(
+                asyncio.to_thread(self.file_manager.write_file, project_name, path, content)
+                for path, content in bundle["files"].items()
+            )
+        )
+        
+        return bundle
+    
+    @staticmethod
+    def _is_valid_bundle(bundle: Any) -> bool:
+        """A bundle needs a plan, an architecture and files under the allowed directories"""
+        
+        if not isinstance(bundle, dict):
+            return False
+        if not isinstance(bundle.get("project_plan"), dict) or not isinstance(bundle.get("architecture"), dict):
+            return False
+        files = bundle.get("files")
+        if not isinstance(files, dict) or not files:
+            return False
+        for path, content in files.items():
+            parts = PurePosixPath(path).parts
+            if not isinstance(content, str) or len(parts) < 2 or parts[0] not in _BUNDLE_FILE_ROOTS or ".." in parts:
+                return False
+        return True
+    
+    async def _ensure_project_dir(self, project_name: str) -> Path:
+        """Create the project's directory on first use and return its path"""
+        
+        project_dir = self._project_dirs.get(project_name)
+        if project_dir is None:
+            project_dir = self.projects_root / project_name
+            await asyncio.to_thread(project_dir.mkdir, parents=True, exist_ok=True)
+            self._project_dirs[project_name] = project_dir
+        return project_dir
+    
+    @staticmethod
+    def _plan_template_id(template_key: Tuple[Any, ...]) -> str:
+        """Stable cache key for a (frontend, backend, database, include_ai, deployment) stack"""
+        
+        return hashlib.sha256(json_utils.dumps(template_key).encode("utf-8")).hexdigest()
+    
+    async def _customize_plan_template(
+        self,
+        template_key: Tuple[Any, ...],
+        project_name: str,
+        description: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Adapt the cached plan for this stack to the given project. Returns None when
+        there is no cached plan or the adapted plan cannot be parsed.
+        """
+        
+        if self._template_cache is None:
+            return None
+        
+        cached_plan = await self._template_cache.get(self._plan_template_id(template_key))
+        if cached_plan is None:
+            return None
+        
+        logger.info(f"Adapting cached project plan template for {project_name}")
+        
+        prompt = _CUSTOMIZE_PLAN_PROMPT + _CUSTOMIZE_PLAN_DETAILS.substitute(
+            project_name=project_name,
+            description=description,
+            project_plan=cached_plan
+        )
+        
+        response_text = await self._cached_generate(prompt, _CUSTOMIZE_PLAN_PROMPT)
+        try:
+            project_plan = parse_json_string(json_utils.clean_json(response_text))
+        except ValueError:
+            return None
+        
+        return project_plan if isinstance(project_plan, dict) else None
+    
+    async def _store_plan_template(self, template_key: Tuple[Any, ...], project_plan: Any) -> None:
+        """Cache a freshly generated plan as the template for its stack"""
+        
+        if self._template_cache is None or not isinstance(project_plan, dict):
+            return
+        
+        await self._template_cache.set(
+            self._plan_template_id(template_key),
+            json_utils.dumps(project_plan, indent=True)
+        )
+    
+    async def create_project_plans_batch(
+        self,
+        specs: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Create project plans for several projects concurrently. Each spec holds the
+        keyword arguments of create_project_plan; the result list is in spec order
+        and holds the exception in place of the plan for any project that failed.
+        """
+        
+        logger.info(f"Creating project plans for {len(specs)} projects")
+        
+        return await asyncio.gather(
+            *(self.create_project_plan(**spec) for spec in specs),
+            return_exceptions=True
+        )
+    
     async def create_architecture(
         self,
         project_id: str,
-        project_plan: Dict[str, Any]
+        project_plan: Dict[str, Any],
+        project_name: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Create system architecture based on the project plan"""
+        """
+        Create system architecture based on the project plan and save it in the
+        project_name directory (by default the plan's project name)
+        """
         
         logger.info(f"Creating architecture for project {project_id}")
         
-        # Convert project plan to string for the prompt
-        project_plan_str = json.dumps(project_plan, indent=2)
-        
-        prompt = f"""
-        Act as an expert Software Architect. Based on the following project plan, 
-        create a detailed system architecture:
-        
-        {project_plan_str}
-        
-        Create a comprehensive architecture document with the following components:
-        
-        1. System Overview - Overall architectural approach
-        2. Component Diagram - Description of main components and their interactions
-        3. Data Flow - How data moves through the system
-        4. Frontend Architecture - Component structure, state management, routing
-        5. Backend Architecture - API structure, service layers, middleware
-        6. Database Schema - Tables/collections, relationships, indexes
-        7. AI Components (if applicable) - Machine learning models, data pipelines
-        8. Deployment Architecture - Container strategy, services, scaling
-        
-        Return your response as a JSON object with the following structure:
-        
-        ```json
-        {{
-            "system_overview": "string",
-            "components": [
-                {{
-                    "name": "string",
-                    "description": "string",
-                    "responsibilities": ["string"]
-                }}
-            ],
-            "data_flow": [
-                {{
-                    "step": "string",
-                    "description": "string",
-                    "from_component": "string",
-                    "to_component": "string",
-                    "data": "string"
-                }}
-            ],
-            "frontend": {{
-                "components": ["string"],
-                "state_management": "string",
-                "routing": "string",
-                "api_integration": "string",
-                "file_structure": {{
-                    "directory_name": "string",
-                    "description": "string",
-                    "files": [
-                        {{
-                            "file_name": "string",
-                            "description": "string"
-                        }}
-                    ],
-                    "subdirectories": [
-                        // Recursive structure of the same form
-                    ]
-                }}
-            }},
-            "backend": {{
-                "api_structure": ["string"],
-                "services": ["string"],
-                "middleware": ["string"],
-                "file_structure": {{
-                    "directory_name": "string",
-                    "description": "string",
-                    "files": [
-                        {{
-                            "file_name": "string",
-                            "description": "string"
-                        }}
-                    ],
-                    "subdirectories": [
-                        // Recursive structure of the same form
-                    ]
-                }}
-            }},
-            "database": {{
-                "schema": [
-                    {{
-                        "table_name": "string",
-                        "description": "string",
-                        "fields": [
-                            {{
-                                "name": "string",
-                                "type": "string",
-                                "description": "string",
-                                "constraints": ["string"]
-                            }}
-                        ],
-                        "relationships": [
-                            {{
-                                "related_table": "string",
-                                "type": "string",
-                                "through": "string"  // For many-to-many
-                            }}
-                        ]
-                    }}
-                ]
-            }},
-            "ai": {{ // Only if AI components are included
-                "models": [
-                    {{
-                        "name": "string",
-                        "purpose": "string",
-                        "inputs": ["string"],
-                        "outputs": ["string"],
-                        "training_data": "string"
-                    }}
-                ],
-                "data_pipelines": [
-                    {{
-                        "name": "string",
-                        "description": "string",
-                        "steps": ["string"]
-                    }}
-                ],
-                "file_structure": {{
-                    "directory_name": "string",
-                    "description": "string",
-                    "files": [
-                        {{
-                            "file_name": "string",
-                            "description": "string"
-                        }}
-                    ],
-                    "subdirectories": [
-                        // Recursive structure of the same form
-                    ]
-                }}
-            }},
-            "deployment": {{
-                "containers": ["string"],
-                "services": ["string"],
-                "infrastructure": ["string"],
-                "scaling_strategy": "string",
-                "file_structure": {{
-                    "directory_name": "string",
-                    "description": "string",
-                    "files": [
-                        {{
-                            "file_name": "string",
-                            "description": "string"
-                        }}
-                    ]
-                }}
-            }}
-        }}
-        ```
-        
-        Be specific and ensure the architecture is implementable with the specified technologies.
-        Focus on practical file structures that our agents can create.
-        """
+        # Convert the fields of the project plan the architect needs to a compact
+        # string for the prompt; indentation only adds input tokens
+        plan_subset = {key: project_plan[key] for key in _ARCHITECTURE_PLAN_FIELDS if key in project_plan}
+        project_plan_str = json_utils.dumps(plan_subset or project_plan)
+        
+        prompt = _ARCHITECTURE_PROMPT + _ARCHITECTURE_DETAILS.substitute(project_plan=project_plan_str)
         
-        response = await self.model.generate_content_async(prompt)
-        response_text = response.text
+        response_text = await self._cached_generate(prompt, _ARCHITECTURE_PROMPT)
         
         # Extract and parse JSON from response
-        json_string = clean_json_string(response_text)
+        json_string = json_utils.clean_json(response_text)
         architecture = parse_json_string(json_string)
         
         # Save the architecture to a file
-        self.file_manager.write_json(project_plan.get("project_name", f"project_{project_id}"), "architecture.json", architecture)
+        await asyncio.to_thread(
+            self.file_manager.write_json,
+            project_name or project_plan.get("project_name", f"project_{project_id}"),
+            "architecture.json",
+            architecture
+        )
         
         return architecture
     
+    async def run_parallel_phase(
+        self,
+        project_id: str,
+        phases: Dict[str, Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        """
+        Run independent pipeline phases (e.g. frontend, backend and AI generation)
+        concurrently and return their results by phase name. If any phase fails the
+        remaining phases are cancelled, so no LLM calls are spent on a project that
+        has already failed, and the first error is raised.
+        """
+        
+        logger.info(f"Running phases {', '.join(phases)} for project {project_id}")
+        
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = {name: tg.create_task(phase) for name, phase in phases.items()}
+        except ExceptionGroup as eg:
+            # Surface a single error to callers that expect a plain exception
+            raise eg.exceptions[0]
+        
+        return {name: task.result() for name, task in tasks.items()}
+    
     async def finalize_project(
         self,
         project_id: str,
@@ -323,80 +836,44 @@ class ProjectManagerAgent:
         
         logger.info(f"Finalizing project {project_id}")
         
-        # Load project plan and architecture
-        project_plan = self.file_manager.read_json(project_name, "project_plan.json")
-        architecture = self.file_manager.read_json(project_name, "architecture.json")
-        
-        # Get list of all files created
-        files = self.file_manager.get_project_files(project_name)
-        
-        prompt = f"""
-        Act as a Project Manager conducting a final review of a completed software project.
-        
-        Project Name: {project_name}
-        Project ID: {project_id}
-        
-        The project has been completed. The files generated include:
-        
-        {json.dumps(files, indent=2)}
-        
-        Based on the original project plan and architecture, create a final project report with the following:
-        
-        1. Executive Summary - Brief overview of what was accomplished
-        2. Features Implemented - List of features successfully implemented
-        3. Technical Overview - Brief description of the technical stack used
-        4. Project Structure - Overview of the directory structure
-        5. Setup Instructions - How to set up and run the project
-        6. Next Steps - Recommendations for future development
-        
-        Return your response as a JSON object with the following structure:
-        
-        ```json
-        {{
-            "executive_summary": "string",
-            "features_implemented": ["string"],
-            "technical_overview": "string",
-            "project_structure": "string",
-            "setup_instructions": "string",
-            "next_steps": ["string"]
-        }}
-        ```
+        # Load project plan and architecture, and get list of all files created
+        project_plan, architecture, files = await asyncio.gather(
+            asyncio.to_thread(self.file_manager.read_json, project_name, "project_plan.json"),
+            asyncio.to_thread(self.file_manager.read_json, project_name, "architecture.json"),
+            asyncio.to_thread(self.file_manager.get_project_files, project_name)
+        )
         
-        Be concise but comprehensive in your report.
-        """
+        prompt = _FINAL_REPORT_PROMPT + _FINAL_REPORT_DETAILS.substitute(
+            project_name=project_name,
+            project_id=project_id,
+            files=json_utils.dumps(files, indent=True)
+        )
         
-        response = await self.model.generate_content_async(prompt)
-        response_text = response.text
+        response_text = await self._cached_generate(prompt, _FINAL_REPORT_PROMPT)
         
         # Extract and parse JSON from response
-        json_string = clean_json_string(response_text)
+        json_string = json_utils.clean_json(response_text)
         final_report = parse_json_string(json_string)
         
         # Generate README.md based on the final report
-        readme_content = f"""# {project_name}
-
-## Executive Summary
-{final_report.get('executive_summary', '')}
-
-## Features Implemented
-{"".join([f"- {feature}\\n" for feature in final_report.get('features_implemented', [])])}
-
-## Technical Overview
-{final_report.get('technical_overview', '')}
-
-## Project Structure
-{final_report.get('project_structure', '')}
-
-## Setup Instructions
-{final_report.get('setup_instructions', '')}
-
-## Next Steps
-{"".join([f"- {step}\\n" for step in final_report.get('next_steps', [])])}
-
-"""
+        readme_content = _README_TEMPLATE.format_map({
+            "project_name": project_name,
+            "executive_summary": final_report.get("executive_summary", ""),
+            "features_implemented": "\n".join(
+                f"- {feature}" for feature in final_report.get("features_implemented", [])
+            ),
+            "technical_overview": final_report.get("technical_overview", ""),
+            "project_structure": final_report.get("project_structure", ""),
+            "setup_instructions": final_report.get("setup_instructions", ""),
+            "next_steps": "\n".join(
+                f"- {step}" for step in final_report.get("next_steps", [])
+            ),
+        })
         
         # Save the final report and README
-        self.file_manager.write_json(project_name, "final_report.json", final_report)
-        self.file_manager.write_file(project_name, "README.md", readme_content)
+        await asyncio.gather(
+            asyncio.to_thread(self.file_manager.write_json, project_name, "final_report.json", final_report),
+            asyncio.to_thread(self.file_manager.write_file, project_name, "README.md", readme_content)
+        )
         
         return final_report
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Vibe Coding System - Agent Scheduler
+Shares a fixed number of agent slots fairly between concurrent projects
+"""
+
+import asyncio
+import collections
+import contextlib
+import inspect
+import time
+from typing import AsyncIterator, Awaitable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class FairAgentScheduler:
+    """
+    A semaphore whose waiters are served round-robin across project IDs rather
+    than first come, first served, so a project with many queued agent steps
+    cannot starve projects that arrived after it. A waiter that has waited longer
+    than max_wait_seconds is served ahead of the rotation (priority aging).
+    """
+
+    def __init__(self, slots: int, max_wait_seconds: float):
+        self.slots = slots
+        self.max_wait_seconds = max_wait_seconds
+        self._available = slots
+        # Waiters per project in arrival order; dict order is the rotation order
+        self._waiters: Dict[str, Deque[Tuple[float, asyncio.Future]]] = collections.OrderedDict()
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pop the waiter to serve next: the oldest overdue one, else the next project's"""
+
+        if not self._waiters:
+            return None
+
+        project_id = next(iter(self._waiters))
+        now = time.monotonic()
+        overdue = [
+            (waiters[0][0], waiting_project)
+            for waiting_project, waiters in self._waiters.items()
+            if now - waiters[0][0] > self.max_wait_seconds
+        ]
+        if overdue:
+            project_id = min(overdue)[1]
+
+        waiters = self._waiters.pop(project_id)
+        _, future = waiters.popleft()
+        if waiters:
+            # Back of the rotation
+            self._waiters[project_id] = waiters
+        return future
+
+    def _release(self) -> None:
+        while True:
+            future = self._next_waiter()
+            if future is None:
+                self._available += 1
+                return
+            if not future.done():
+                future.set_result(None)
+                return
+
+    async def _acquire(self, project_id: str) -> None:
+        if self._available > 0 and not self._waiters:
+            self._available -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(project_id, collections.deque()).append((time.monotonic(), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the waiter was cancelled
+                self._release()
+            else:
+                self._discard(project_id, future)
+            raise
+
+    def _discard(self, project_id: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(project_id)
+        if waiters is None:
+            return
+        for entry in waiters:
+            if entry[1] is future:
+                waiters.remove(entry)
+                break
+        if not waiters:
+            del self._waiters[project_id]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, project_id: str) -> AsyncIterator[None]:
+        """Hold one agent slot on behalf of project_id"""
+
+        await self._acquire(project_id)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def submit(self, project_id: str, step: Awaitable[T]) -> T:
+        """Await step while holding an agent slot for project_id"""
+
+        try:
+            await self._acquire(project_id)
+        except BaseException:
+            if inspect.iscoroutine(step):
+                # Never going to run; close it to avoid the "never awaited" warning
+                step.close()
+            raise
+        try:
+            return await step
+        finally:
+            self._release()
@@ -4,8 +4,11 @@ Handles all configuration settings for the application
 """
 
 import os
-from pydantic import BaseSettings, Field
-from typing import Dict, Any, Optional, List
+import functools
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from types import MappingProxyType
+from typing import ClassVar, Dict, Any, Mapping, Optional, List
 from pathlib import Path
 import google.generativeai as genai
 from dotenv import load_dotenv
@@ -13,19 +16,158 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Project structure templates. These are read-only lookup tables, so they are built
+# once here rather than per Settings instance; each framework's files are
+# (path, template) pairs.
+FRONTEND_FRAMEWORKS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "react": MappingProxyType({
+        "template_dir": "frontend/react",
+        "files": (
+            ("package.json", "react/package.json"),
+            ("src/App.js", "react/App.js"),
+            ("src/index.js", "react/index.js"),
+        )
+    }),
+    "vue": MappingProxyType({
+        "template_dir": "frontend/vue",
+        "files": (
+            ("package.json", "vue/package.json"),
+            ("src/App.vue", "vue/App.vue"),
+            ("src/main.js", "vue/main.js"),
+        )
+    }),
+    "angular": MappingProxyType({
+        "template_dir": "frontend/angular",
+        "files": (
+            ("package.json", "angular/package.json"),
+            ("src/app/app.component.ts", "angular/app.component.ts"),
+            ("src/main.ts", "angular/main.ts"),
+        )
+    }),
+})
+
+BACKEND_FRAMEWORKS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "fastapi": MappingProxyType({
+        "template_dir": "backend/fastapi",
+        "files": (
+            ("main.py", "fastapi/main.py"),
+            ("requirements.txt", "fastapi/requirements.txt"),
+            ("api/routes.py", "fastapi/routes.py"),
+        )
+    }),
+    "flask": MappingProxyType({
+        "template_dir": "backend/flask",
+        "files": (
+            ("app.py", "flask/app.py"),
+            ("requirements.txt", "flask/requirements.txt"),
+            ("api/routes.py", "flask/routes.py"),
+        )
+    }),
+    "django": MappingProxyType({
+        "template_dir": "backend/django",
+        "files": (
+            ("manage.py", "django/manage.py"),
+            ("requirements.txt", "django/requirements.txt"),
+            ("project/settings.py", "django/settings.py"),
+        )
+    }),
+})
+
+DATABASE_TEMPLATES: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "postgresql": MappingProxyType({
+        "template_dir": "database/postgresql",
+        "files": (
+            ("models.py", "postgresql/models.py"),
+            ("db_config.py", "postgresql/db_config.py"),
+        )
+    }),
+    "mongodb": MappingProxyType({
+        "template_dir": "database/mongodb",
+        "files": (
+            ("models.py", "mongodb/models.py"),
+            ("db_config.py", "mongodb/db_config.py"),
+        )
+    }),
+    "sqlite": MappingProxyType({
+        "template_dir": "database/sqlite",
+        "files": (
+            ("models.py", "sqlite/models.py"),
+            ("db_config.py", "sqlite/db_config.py"),
+        )
+    }),
+})
+
+AI_TEMPLATES: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "ml_basic": MappingProxyType({
+        "template_dir": "ai/ml_basic",
+        "files": (
+            ("model.py", "ml_basic/model.py"),
+            ("train.py", "ml_basic/train.py"),
+            ("predict.py", "ml_basic/predict.py"),
+        )
+    }),
+    "nlp": MappingProxyType({
+        "template_dir": "ai/nlp",
+        "files": (
+            ("model.py", "nlp/model.py"),
+            ("processor.py", "nlp/processor.py"),
+            ("train.py", "nlp/train.py"),
+        )
+    }),
+})
+
+DEPLOYMENT_TEMPLATES: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "docker": MappingProxyType({
+        "template_dir": "deployment/docker",
+        "files": (
+            ("Dockerfile", "docker/Dockerfile"),
+            ("docker-compose.yml", "docker/docker-compose.yml"),
+            (".dockerignore", "docker/.dockerignore"),
+        )
+    }),
+    "kubernetes": MappingProxyType({
+        "template_dir": "deployment/kubernetes",
+        "files": (
+            ("deployment.yaml", "kubernetes/deployment.yaml"),
+            ("service.yaml", "kubernetes/service.yaml"),
+            ("configmap.yaml", "kubernetes/configmap.yaml"),
+        )
+    }),
+})
+
+# Agent roles with a system prompt in templates/prompts/<role>.md
+AGENT_ROLES = ("project_manager", "frontend", "backend", "ai", "technical_writer")
+
+@functools.lru_cache(maxsize=None)
+def _read_prompt(path: str) -> str:
+    """Read a prompt file once per process"""
+    return Path(path).read_text(encoding="utf-8")
+
 class Settings(BaseSettings):
+    # API key genai was last configured with; the SDK configuration is process-wide,
+    # so it is tracked on the class rather than per Settings instance
+    _configured_api_key: ClassVar[Optional[str]] = None
+    
     # Application Settings
     app_name: str = "Vibe Coding System"
     app_version: str = "1.0.0"
     debug: bool = Field(default=False)
+    max_concurrent_agents: int = Field(default=4)  # agent steps running at once across projects
+    agent_max_wait_seconds: float = Field(default=60.0)  # agent steps waiting longer jump the rotation
+    io_threads: int = Field(default=32)  # default executor size for off-loop filesystem work
+    max_batch_projects: int = Field(default=100)  # projects accepted per /projects/batch request
+    # Window in which a repeated POST /project (same Idempotency-Key header, or same body
+    # without one) returns the project already created for it; 0 disables it
+    submission_dedupe_seconds: int = Field(default=300)
+    api_workers: int = Field(default=1)  # uvicorn worker processes when run with `python main.py`
     
-    # Path Settings
-    base_dir: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    projects_root_dir: str = Field(default=os.path.join(base_dir, "projects"))
-    templates_dir: str = Field(default=os.path.join(base_dir, "templates"))
+    # Path Settings; the directories default to locations under base_dir
+    base_dir: str = Field(default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    projects_root_dir: str = Field(default="")
+    templates_dir: str = Field(default="")
     
     # Google ADK Settings
-    google_api_key: str = Field(default=os.getenv("GOOGLE_API_KEY", ""))
+    google_api_key: str = Field(default="")
     
     # Gemini Model Settings
     gemini_model: str = Field(default="gemini-flash")  # The Gemini 2 Flash model
@@ -33,123 +175,63 @@ class Settings(BaseSettings):
     gemini_top_p: float = Field(default=0.8)
     gemini_top_k: int = Field(default=40)
     gemini_max_tokens: int = Field(default=8192)
+    gemini_max_concurrency: int = Field(default=16)  # LLM dispatcher worker count
+    gemini_requests_per_minute: int = Field(default=60, gt=0)
+    gemini_tokens_per_minute: int = Field(default=1000000, gt=0)
+    gemini_max_attempts: int = Field(default=5)
+    gemini_retry_min_seconds: float = Field(default=1.0)
+    gemini_retry_max_seconds: float = Field(default=30.0)
+    # Consecutive transient failures before Gemini calls fail fast, and for how long
+    gemini_circuit_breaker_threshold: int = Field(default=5)
+    gemini_circuit_breaker_reset_seconds: float = Field(default=30.0)
+    # Store static prompt prefixes as Gemini cached content (needs a versioned model
+    # name, e.g. "models/gemini-1.5-flash-001", and prefixes above the minimum size)
+    gemini_context_cache_enabled: bool = Field(default=False)
+    gemini_context_cache_ttl_seconds: int = Field(default=60 * 60)
+    # genai client transport ("grpc", "grpc_asyncio" or "rest"); unset uses the SDK default
+    gemini_transport: Optional[str] = Field(default=None)
+    gemini_warm_up: bool = Field(default=True)  # open the Gemini connection at startup
     
-    # Project Structure Templates
-    frontend_frameworks: Dict[str, Dict[str, Any]] = {
-        "react": {
-            "template_dir": "frontend/react",
-            "files": [
-                {"path": "package.json", "template": "react/package.json"},
-                {"path": "src/App.js", "template": "react/App.js"},
-                {"path": "src/index.js", "template": "react/index.js"},
-            ]
-        },
-        "vue": {
-            "template_dir": "frontend/vue",
-            "files": [
-                {"path": "package.json", "template": "vue/package.json"},
-                {"path": "src/App.vue", "template": "vue/App.vue"},
-                {"path": "src/main.js", "template": "vue/main.js"},
-            ]
-        },
-        "angular": {
-            "template_dir": "frontend/angular",
-            "files": [
-                {"path": "package.json", "template": "angular/package.json"},
-                {"path": "src/app/app.component.ts", "template": "angular/app.component.ts"},
-                {"path": "src/main.ts", "template": "angular/main.ts"},
-            ]
-        }
-    }
+    # Generate frontend package.json/index.html with the LLM instead of static templates
+    llm_generated_config: bool = Field(default=False)
     
-    backend_frameworks: Dict[str, Dict[str, Any]] = {
-        "fastapi": {
-            "template_dir": "backend/fastapi",
-            "files": [
-                {"path": "main.py", "template": "fastapi/main.py"},
-                {"path": "requirements.txt", "template": "fastapi/requirements.txt"},
-                {"path": "api/routes.py", "template": "fastapi/routes.py"},
-            ]
-        },
-        "flask": {
-            "template_dir": "backend/flask",
-            "files": [
-                {"path": "app.py", "template": "flask/app.py"},
-                {"path": "requirements.txt", "template": "flask/requirements.txt"},
-                {"path": "api/routes.py", "template": "flask/routes.py"},
-            ]
-        },
-        "django": {
-            "template_dir": "backend/django",
-            "files": [
-                {"path": "manage.py", "template": "django/manage.py"},
-                {"path": "requirements.txt", "template": "django/requirements.txt"},
-                {"path": "project/settings.py", "template": "django/settings.py"},
-            ]
-        }
-    }
+    # LLM Response Cache Settings
+    llm_cache_enabled: bool = Field(default=True)
+    llm_cache_dir: str = Field(default="")
+    llm_cache_ttl_seconds: int = Field(default=7 * 24 * 60 * 60)
+    llm_cache_max_temperature: float = Field(default=0.2)
+    # Part of every cache key; change it to invalidate all cached responses
+    llm_cache_version: str = Field(default="1")
+    # Reuse project plans generated for the same stack as templates for new projects.
+    # Only create_project_plan (e.g. batch plans) adapts templates; the pipeline's
+    # streamed plan-and-architecture call stores its plans here but never reads them,
+    # since adapting a template would split that call back into two
+    plan_template_cache_enabled: bool = Field(default=True)
+    plan_template_cache_dir: str = Field(default="")
+    # Projects without AI whose description is shorter than this many characters are
+    # generated by a single Gemini call instead of the agent pipeline; 0 disables it
+    fast_path_description_chars: int = Field(default=0)
     
-    database_templates: Dict[str, Dict[str, Any]] = {
-        "postgresql": {
-            "template_dir": "database/postgresql",
-            "files": [
-                {"path": "models.py", "template": "postgresql/models.py"},
-                {"path": "db_config.py", "template": "postgresql/db_config.py"},
-            ]
-        },
-        "mongodb": {
-            "template_dir": "database/mongodb",
-            "files": [
-                {"path": "models.py", "template": "mongodb/models.py"},
-                {"path": "db_config.py", "template": "mongodb/db_config.py"},
-            ]
-        },
-        "sqlite": {
-            "template_dir": "database/sqlite",
-            "files": [
-                {"path": "models.py", "template": "sqlite/models.py"},
-                {"path": "db_config.py", "template": "sqlite/db_config.py"},
-            ]
-        }
-    }
+    # Project Store Settings ("sqlite" or "memory"); finished projects expire after the
+    # TTL, and beyond max_finished_projects the least recently used are dropped early
+    project_store_backend: str = Field(default="sqlite")
+    project_store_path: str = Field(default="")
+    project_ttl_seconds: int = Field(default=24 * 60 * 60)
+    max_finished_projects: int = Field(default=10_000)
     
-    ai_templates: Dict[str, Dict[str, Any]] = {
-        "ml_basic": {
-            "template_dir": "ai/ml_basic",
-            "files": [
-                {"path": "model.py", "template": "ml_basic/model.py"},
-                {"path": "train.py", "template": "ml_basic/train.py"},
-                {"path": "predict.py", "template": "ml_basic/predict.py"},
-            ]
-        },
-        "nlp": {
-            "template_dir": "ai/nlp",
-            "files": [
-                {"path": "model.py", "template": "nlp/model.py"},
-                {"path": "processor.py", "template": "nlp/processor.py"},
-                {"path": "train.py", "template": "nlp/train.py"},
-            ]
-        }
-    }
+    # Task Queue Settings; "background" runs projects in the API process, "arq" hands
+    # them to workers started with `arq workers.WorkerSettings`
+    task_queue_backend: str = Field(default="background")
+    redis_url: str = Field(default="redis://localhost:6379")
+    task_max_tries: int = Field(default=3)
+    task_timeout_seconds: int = Field(default=60 * 60)
     
-    deployment_templates: Dict[str, Dict[str, Any]] = {
-        "docker": {
-            "template_dir": "deployment/docker",
-            "files": [
-                {"path": "Dockerfile", "template": "docker/Dockerfile"},
-                {"path": "docker-compose.yml", "template": "docker/docker-compose.yml"},
-                {"path": ".dockerignore", "template": "docker/.dockerignore"},
-            ]
-        },
-        "kubernetes": {
-            "template_dir": "deployment/kubernetes",
-            "files": [
-                {"path": "deployment.yaml", "template": "kubernetes/deployment.yaml"},
-                {"path": "service.yaml", "template": "kubernetes/service.yaml"},
-                {"path": "configmap.yaml", "template": "kubernetes/configmap.yaml"},
-            ]
-        }
-    }
+    # Project Structure Templates (shared, read-only)
+    frontend_frameworks: ClassVar[Mapping[str, Mapping[str, Any]]] = FRONTEND_FRAMEWORKS
+    backend_frameworks: ClassVar[Mapping[str, Mapping[str, Any]]] = BACKEND_FRAMEWORKS
+    database_templates: ClassVar[Mapping[str, Mapping[str, Any]]] = DATABASE_TEMPLATES
+    ai_templates: ClassVar[Mapping[str, Mapping[str, Any]]] = AI_TEMPLATES
+    deployment_templates: ClassVar[Mapping[str, Mapping[str, Any]]] = DEPLOYMENT_TEMPLATES
     
     # Project structure definitions
     default_project_structure: Dict[str, List[str]] = {
@@ -158,89 +240,54 @@ class Settings(BaseSettings):
         "docs": ["api", "user_guide", "development"],
     }
     
-    # Agent settings
-    agent_prompts: Dict[str, str] = {
-        "project_manager": """
-        You are a Project Manager Agent that specializes in understanding user requirements,
-        breaking them down into clear tasks, and coordinating the development of software projects.
-        Your responsibilities include:
-        
-        1. Understanding user requirements comprehensively
-        2. Creating detailed project plans with clear task breakdowns
-        3. Designing system architecture that meets requirements
-        4. Coordinating between specialized agents (Frontend, Backend, AI, Documentation)
-        5. Ensuring project deliverables meet or exceed user expectations
-        6. Final verification and quality assurance
-        
-        Approach each project methodically, considering best practices in software development,
-        and ensure all components work together seamlessly.
-        """,
-        
-        "frontend": """
-        You are a Frontend Development Agent specializing in creating responsive, 
-        accessible, and visually appealing user interfaces. Your responsibilities include:
-        
-        1. Implementing UI/UX designs with clean, semantic code
-        2. Creating responsive layouts that work across devices
-        3. Implementing interactive components and client-side logic
-        4. Integrating with backend APIs effectively
-        5. Following frontend best practices for performance and accessibility
-        
-        You work primarily with frameworks like React, Vue, or Angular, and you understand
-        modern CSS practices, JavaScript/TypeScript, and frontend build tools.
-        """,
-        
-        "backend": """
-        You are a Backend Development Agent specializing in server-side logic, 
-        APIs, databases, and infrastructure. Your responsibilities include:
-        
-        1. Designing and implementing API endpoints
-        2. Creating data models and database schemas
-        3. Implementing business logic and service layers
-        4. Ensuring security, performance, and scalability
-        5. Setting up authentication and authorization systems
-        
-        You work primarily with frameworks like FastAPI, Flask, or Django, and you understand
-        database systems, API design principles, and backend security best practices.
-        """,
-        
-        "ai": """
-        You are an AI Development Agent specializing in machine learning, natural language processing,
-        and data science integration into applications. Your responsibilities include:
-        
-        1. Designing ML/AI components that solve specific problems
-        2. Implementing data processing pipelines
-        3. Creating model training and inference code
-        4. Integrating AI capabilities with the main application
-        5. Ensuring AI components are efficient and effective
-        
-        You understand ML frameworks, data processing techniques, and how to integrate AI
-        capabilities into software applications effectively.
-        """,
-        
-        "technical_writer": """
-        You are a Technical Documentation Agent specializing in creating clear, concise,
-        and comprehensive documentation. Your responsibilities include:
-        
-        1. Creating system architecture documentation
-        2. Writing API documentation and reference guides
-        3. Creating user guides and tutorials
-        4. Documenting setup and deployment procedures
-        5. Ensuring documentation is accurate and accessible
-        
-        You understand technical concepts across frontend, backend, and AI domains,
-        and can explain them clearly to both technical and non-technical audiences.
-        """
-    }
-    
     # Configure API clients
     def setup_gemini(self):
-        """Configure the Gemini API client"""
+        """Configure the Gemini API client (once per process and API key)"""
         if self.google_api_key:
-            genai.configure(api_key=self.google_api_key)
+            if Settings._configured_api_key == self.google_api_key:
+                return
+            # The SDK keeps one client (and with it one HTTP/2 channel, or one pooled
+            # HTTP session for "rest") per configuration; every call reuses it
+            options: Dict[str, Any] = {"api_key": self.google_api_key}
+            if self.gemini_transport:
+                options["transport"] = self.gemini_transport
+            genai.configure(**options)
+            Settings._configured_api_key = self.google_api_key
         else:
             raise ValueError("Google API key not set. Please set GOOGLE_API_KEY environment variable.")
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
\ No newline at end of file
+    # Agent settings
+    def get_agent_prompt(self, role: str) -> str:
+        """System prompt for an agent role, loaded from templates/prompts/<role>.md"""
+        return _read_prompt(os.path.join(self.templates_dir, "prompts", f"{role}.md"))
+    
+    def check_agent_prompts(self) -> None:
+        """Fail fast at startup, rather than mid-project, if an agent's prompt file is missing"""
+        missing = [
+            path for path in (os.path.join(self.templates_dir, "prompts", f"{role}.md") for role in AGENT_ROLES)
+            if not os.path.isfile(path)
+        ]
+        if missing:
+            raise FileNotFoundError(f"Agent prompt files not found: {', '.join(missing)}")
+    
+    @model_validator(mode="after")
+    def _default_dirs(self) -> "Settings":
+        """Resolve directories that were not set explicitly against base_dir"""
+        if not self.projects_root_dir:
+            self.projects_root_dir = os.path.join(self.base_dir, "projects")
+        if not self.templates_dir:
+            self.templates_dir = os.path.join(self.base_dir, "templates")
+        if not self.llm_cache_dir:
+            self.llm_cache_dir = os.path.join(self.base_dir, ".cache", "llm")
+        if not self.plan_template_cache_dir:
+            self.plan_template_cache_dir = os.path.join(self.base_dir, ".cache", "plan_templates")
+        if not self.project_store_path:
+            self.project_store_path = os.path.join(self.base_dir, ".cache", "projects.sqlite3")
+        return self
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        # Ignore unrelated variables in .env, as pydantic v1 settings did
+        extra="ignore",
+    )
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Vibe Coding System - JSON Helpers
+JSON encoding/decoding that uses orjson when it is installed
+"""
+
+import json
+from typing import Any, List, Optional, Union
+
+from core.utils import clean_json_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Serialize obj to a JSON string, indented by two spaces when indent is set and
+    with object keys sorted when sort_keys is set (for stable hashing)
+    """
+
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option).decode()
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, ensure_ascii=False)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document from str or bytes"""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def clean_json(text: str) -> str:
+    """
+    Extract the JSON object from an LLM response. Slices from the first "{" to the
+    last "}", which covers fenced and bare objects without a regex pass; other
+    responses go through core.utils.clean_json_string.
+    """
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if 0 <= start < end:
+        return text[start:end + 1]
+    return clean_json_string(text)
+
+
+class JSONDocumentScanner:
+    """
+    Finds the end of the first top-level JSON object or array in text that arrives
+    in chunks, e.g. a streamed LLM response wrapped in a markdown code fence.
+    Text before the opening bracket is skipped. For an object, each top-level
+    member ('"key": value') is appended to members as soon as it is complete.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.members: List[str] = []
+        self._member_start: Optional[int] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        """Append a chunk and return True once the document is complete"""
+
+        self.text += chunk
+        if self.end is not None:
+            return True
+
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self.start is None:
+                if char in "{[":
+                    self.start = i
+                    self._depth = 1
+                    if char == "{":
+                        self._member_start = i + 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char == "," and self._depth == 1:
+                self._end_member(i)
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end_member(i)
+                    self.end = i + 1
+                    return True
+        self._pos = len(text)
+        return False
+
+    def _end_member(self, end: int) -> None:
+        if self._member_start is None:
+            return
+        member = self.text[self._member_start:end].strip()
+        if member:
+            self.members.append(member)
+        self._member_start = end + 1
+
+    @property
+    def document(self) -> Optional[str]:
+        """The complete JSON document, or None if it has not closed yet"""
+
+        if self.end is None:
+            return None
+        return self.text[self.start:self.end]
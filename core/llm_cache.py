@@ -0,0 +1,143 @@
+"""
+Vibe Coding System - LLM Response Cache
+Prompt/response caching so that repeated deterministic prompts skip the Gemini call
+"""
+
+import asyncio
+import collections
+import hashlib
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Protocol
+
+from core import json_utils
+
+# Stands in for the task-specific identifier when fingerprinting a prompt
+_IDENTIFIER_PLACEHOLDER = "<<IDENTIFIER>>"
+# Identifiers shorter than this are too likely to collide with ordinary words
+_MIN_IDENTIFIER_LENGTH = 3
+
+
+def make_cache_key(model_name: str, prompt: str, generation_config: Dict[str, Any]) -> str:
+    """Hash the model, prompt and generation config into a cache key"""
+
+    payload = json_utils.dumps(
+        {"model": model_name, "prompt": prompt, **generation_config},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def mask_identifier(prompt: str, identifier: str) -> Optional[str]:
+    """
+    Replace whole-word occurrences of identifier in the prompt with a placeholder,
+    giving the prompt skeleton shared by tasks that differ only in that name.
+    Returns None if the identifier cannot be masked reliably.
+    """
+
+    if len(identifier) < _MIN_IDENTIFIER_LENGTH or _IDENTIFIER_PLACEHOLDER in prompt:
+        return None
+    pattern = re.compile(rf"(?<![A-Za-z0-9_]){re.escape(identifier)}(?![A-Za-z0-9_])")
+    skeleton, count = pattern.subn(_IDENTIFIER_PLACEHOLDER, prompt)
+    return skeleton if count else None
+
+
+def substitute_identifier(response: str, old: str, new: str) -> Optional[str]:
+    """
+    Rewrite a cached response generated for identifier old so that it uses new.
+    Derived names such as oldProps or oldComponent are rewritten as well. Returns
+    None when the result is not trustworthy, i.e. old never appears in the response
+    or still appears afterwards in another casing.
+    """
+
+    pattern = re.compile(rf"(?<![A-Za-z0-9_]){re.escape(old)}(?![a-z])")
+    rewritten, count = pattern.subn(lambda _: new, response)
+    if not count or old.lower() in rewritten.lower().replace(new.lower(), ""):
+        return None
+    return rewritten
+
+
+class CacheBackend(Protocol):
+    """Storage interface for cached LLM responses"""
+
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    async def set(self, key: str, value: str) -> None:
+        ...
+
+
+class MemoryCache:
+    """In-process LRU cache of LLM responses"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class FileCache:
+    """On-disk cache storing one JSON file per key, expired after ttl_seconds"""
+
+    def __init__(self, cache_dir: str, ttl_seconds: int):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = json_utils.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            return None
+        return entry.get("response")
+
+    def _write(self, key: str, value: str) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temp file first so concurrent readers never see a partial entry
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json_utils.dumps({"created_at": time.time(), "response": value}))
+        os.replace(tmp_path, self._path(key))
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._write, key, value)
+
+
+class TieredCache:
+    """Checks the in-memory cache before the on-disk one, and fills both"""
+
+    def __init__(self, memory: MemoryCache, disk: FileCache):
+        self.memory = memory
+        self.disk = disk
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.memory.get(key)
+        if value is None:
+            value = await self.disk.get(key)
+            if value is not None:
+                await self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        await self.memory.set(key, value)
+        await self.disk.set(key, value)
@@ -0,0 +1,496 @@
+"""
+Vibe Coding System - LLM Client
+Shared Gemini model access for all agents
+"""
+
+import asyncio
+import datetime
+import functools
+import logging
+import random
+import time
+import google.generativeai as genai
+from google.generativeai import caching as genai_caching
+from google.api_core import exceptions as google_exceptions
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.config import Settings
+from core import json_utils
+from core.llm_cache import (
+    CacheBackend,
+    FileCache,
+    MemoryCache,
+    TieredCache,
+    make_cache_key,
+    mask_identifier,
+    substitute_identifier,
+)
+from core.llm_dispatcher import LLMDispatcher, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Rate-limit and server-side errors that are worth retrying
+_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Gemini while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive transient failures and rejects calls
+    for reset_seconds. After that, calls go through again; one more failure
+    re-opens the breaker and a success closes it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    def check(self) -> None:
+        """Raise CircuitOpenError while the breaker is open"""
+
+        if self._opened_at is None:
+            return
+        remaining = self._opened_at + self.reset_seconds - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpenError(
+                f"Gemini circuit breaker open after {self._failures} consecutive failures; "
+                f"retry in {remaining:.0f}s"
+            )
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.error("Gemini circuit breaker opened after %d consecutive failures", self._failures)
+            self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Gemini circuit breaker closed")
+        self._failures = 0
+        self._opened_at = None
+
+
+class PromptTemplate:
+    """
+    A prompt with str.format placeholders. template_id is a stable name for the
+    template, used to namespace cache entries independently of the filled-in values.
+    """
+
+    __slots__ = ("template_id", "text")
+
+    def __init__(self, template_id: str, text: str):
+        self.template_id = template_id
+        self.text = text
+
+    def format(self, **values: Any) -> str:
+        return self.text.format(**values)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_model(
+    model_name: str,
+    temperature: float,
+    top_p: float,
+    top_k: int,
+    max_output_tokens: int
+) -> genai.GenerativeModel:
+    """Build a GenerativeModel once per distinct generation config"""
+
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config={
+            "temperature": temperature,
+            "top_p": top_p,
+            "top_k": top_k,
+            "max_output_tokens": max_output_tokens,
+        }
+    )
+
+
+def get_model(settings: Settings) -> genai.GenerativeModel:
+    """
+    Return the shared GenerativeModel for the given settings.
+    Agents with the same generation config reuse one model instance, and with it
+    the SDK's underlying client connection.
+    """
+
+    return _build_model(
+        settings.gemini_model,
+        settings.gemini_temperature,
+        settings.gemini_top_p,
+        settings.gemini_top_k,
+        settings.gemini_max_tokens,
+    )
+
+
+async def warm_up(settings: Settings) -> None:
+    """
+    Open the SDK's connection to Gemini with a metadata request (no tokens used),
+    so DNS, TCP and TLS setup are paid at startup rather than by the first project
+    """
+
+    name = settings.gemini_model
+    if not name.startswith("models/"):
+        name = f"models/{name}"
+    try:
+        await asyncio.to_thread(genai.get_model, name)
+    except google_exceptions.GoogleAPIError as e:
+        logger.warning("Gemini warm-up request failed: %s", e)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_rate_limiter(model_name: str, requests_per_minute: int, tokens_per_minute: int) -> RateLimiter:
+    """Per-minute rate limit shared by every client of the same model quota"""
+
+    return RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_circuit_breaker(model_name: str, failure_threshold: int, reset_seconds: float) -> CircuitBreaker:
+    """Circuit breaker shared by every client of the same model"""
+
+    return CircuitBreaker(failure_threshold, reset_seconds)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_dispatcher(
+    model: genai.GenerativeModel,
+    rate_limiter: RateLimiter,
+    workers: int
+) -> LLMDispatcher:
+    """Worker pool shared by every client of the same model instance"""
+
+    return LLMDispatcher(model, rate_limiter, workers)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_in_flight(model_name: str) -> Dict[str, "asyncio.Task[str]"]:
+    """Calls in progress for the model, keyed by cache key, shared by every client"""
+
+    return {}
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_cache(cache_dir: str, ttl_seconds: int) -> CacheBackend:
+    """Response cache shared by every client writing to the same cache directory"""
+
+    return TieredCache(MemoryCache(), FileCache(cache_dir, ttl_seconds))
+
+
+class LLMClient:
+    """
+    Routes an agent's Gemini calls through the shared LLMDispatcher, so that every
+    agent shares one pool of in-flight calls and one per-minute rate limit instead
+    of bursting into 429s once tasks run in parallel. Responses to deterministic
+    (low temperature) prompts are cached.
+    """
+
+    def __init__(self, settings: Settings, model: genai.GenerativeModel):
+        self.settings = settings
+        self.model = model
+        self.dispatcher = _shared_dispatcher(
+            model,
+            _shared_rate_limiter(
+                settings.gemini_model,
+                settings.gemini_requests_per_minute,
+                settings.gemini_tokens_per_minute,
+            ),
+            settings.gemini_max_concurrency,
+        )
+        self.circuit_breaker = _shared_circuit_breaker(
+            settings.gemini_model,
+            settings.gemini_circuit_breaker_threshold,
+            settings.gemini_circuit_breaker_reset_seconds,
+        )
+        # Models bound to Gemini cached content, keyed by static prompt prefix, with
+        # the monotonic time until which each may be used (None if caching failed)
+        self._context_models: Dict[str, Tuple[float, Optional[genai.GenerativeModel]]] = {}
+        self._context_lock = asyncio.Lock()
+        self._in_flight = _shared_in_flight(settings.gemini_model)
+        self.cache: Optional[CacheBackend] = None
+        if settings.llm_cache_enabled and settings.gemini_temperature <= settings.llm_cache_max_temperature:
+            self.cache = _shared_cache(settings.llm_cache_dir, settings.llm_cache_ttl_seconds)
+
+    def cache_key(
+        self,
+        prompt: str,
+        structural: bool = False,
+        template_id: Optional[str] = None,
+        json_only: bool = False
+    ) -> str:
+        """Cache key for the prompt under this client's model and generation config"""
+
+        return make_cache_key(
+            self.settings.gemini_model,
+            prompt,
+            {
+                "temperature": self.settings.gemini_temperature,
+                "top_p": self.settings.gemini_top_p,
+                "top_k": self.settings.gemini_top_k,
+                "structural": structural,
+                "template_id": template_id,
+                "json_only": json_only,
+                "version": self.settings.llm_cache_version,
+            }
+        )
+
+    async def stream(self, prompt: str, static_prefix: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the response text for the prompt as Gemini streams it. A cached
+        response is yielded as a single chunk, and a response read to the end is
+        cached as generate would cache it. Transient errors are retried only until
+        the first chunk arrives, since text already yielded cannot be taken back.
+        """
+
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(prompt)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        model, request_prompt = await self._request_model(prompt, static_prefix)
+        chunks = []
+        attempt = 0
+        while True:
+            self.circuit_breaker.check()
+            stream = self.dispatcher.stream(request_prompt, model)
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            except _RETRYABLE_ERRORS as e:
+                self.circuit_breaker.record_failure()
+                attempt += 1
+                if chunks or attempt >= self.settings.gemini_max_attempts:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(
+                    "Gemini stream failed (%s), retrying in %.1fs (attempt %d of %d)",
+                    e, delay, attempt + 1, self.settings.gemini_max_attempts
+                )
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                await stream.aclose()
+            break
+
+        self.circuit_breaker.record_success()
+        if key is not None:
+            await self.cache.set(key, "".join(chunks))
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, bounded by the configured min and max"""
+
+        ceiling = min(
+            self.settings.gemini_retry_max_seconds,
+            self.settings.gemini_retry_min_seconds * 2 ** attempt
+        )
+        return max(self.settings.gemini_retry_min_seconds, random.uniform(0, ceiling))
+
+    async def _call_with_retry(self, call: Callable[[], Awaitable[str]]) -> str:
+        """
+        Await call(), retrying transient Gemini errors. Every attempt goes through the
+        shared circuit breaker, so once the provider keeps failing, calls fail fast
+        instead of holding dispatcher workers through the full backoff schedule.
+        """
+
+        attempt = 0
+        while True:
+            self.circuit_breaker.check()
+            try:
+                text = await call()
+            except _RETRYABLE_ERRORS as e:
+                self.circuit_breaker.record_failure()
+                attempt += 1
+                if attempt >= self.settings.gemini_max_attempts:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(
+                    "Gemini call failed (%s), retrying in %.1fs (attempt %d of %d)",
+                    e, delay, attempt + 1, self.settings.gemini_max_attempts
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return text
+
+    async def _submit_with_retry(self, prompt: str, model: Optional[genai.GenerativeModel] = None) -> str:
+        """Submit the prompt, retrying transient Gemini errors"""
+
+        return await self._call_with_retry(lambda: self.dispatcher.submit(prompt, model))
+
+    async def _stream_json(self, prompt: str, model: Optional[genai.GenerativeModel] = None) -> str:
+        """
+        Stream the response to a prompt that asks for a JSON document and stop
+        reading as soon as the top-level object closes, returning just the
+        document. Falls back to the full text if no complete document arrives.
+        """
+
+        scanner = json_utils.JSONDocumentScanner()
+        stream = self.dispatcher.stream(prompt, model)
+        try:
+            async for chunk in stream:
+                if scanner.feed(chunk):
+                    return scanner.document
+            return scanner.text
+        finally:
+            await stream.aclose()
+
+    async def _stream_json_with_retry(self, prompt: str, model: Optional[genai.GenerativeModel] = None) -> str:
+        """Stream a JSON response with _stream_json, retrying transient Gemini errors"""
+
+        return await self._call_with_retry(lambda: self._stream_json(prompt, model))
+
+    async def _context_model(self, prefix: str) -> Optional[genai.GenerativeModel]:
+        """
+        Return a model bound to Gemini cached content holding prefix, creating the
+        cached content on first use and again once its TTL has run out. Returns
+        None if the content cannot be cached (e.g. it is below the model's
+        minimum cacheable size); the prefix is then sent inline until the TTL ends.
+        """
+
+        key = make_cache_key(self.settings.gemini_model, prefix, {"context": True})
+        async with self._context_lock:
+            entry = self._context_models.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            ttl_seconds = self.settings.gemini_context_cache_ttl_seconds
+            model: Optional[genai.GenerativeModel] = None
+            try:
+                cached_content = await asyncio.to_thread(
+                    genai_caching.CachedContent.create,
+                    model=self.settings.gemini_model,
+                    contents=[prefix],
+                    ttl=datetime.timedelta(seconds=ttl_seconds),
+                )
+                model = genai.GenerativeModel.from_cached_content(
+                    cached_content,
+                    generation_config={
+                        "temperature": self.settings.gemini_temperature,
+                        "top_p": self.settings.gemini_top_p,
+                        "top_k": self.settings.gemini_top_k,
+                        "max_output_tokens": self.settings.gemini_max_tokens,
+                    }
+                )
+            except google_exceptions.GoogleAPIError as e:
+                logger.warning("Could not create Gemini cached content, sending prompt prefix inline: %s", e)
+
+            # Stop using the cached content a little before Gemini expires it
+            self._context_models[key] = (time.monotonic() + ttl_seconds * 0.9, model)
+            return model
+
+    async def _request_model(
+        self,
+        prompt: str,
+        static_prefix: Optional[str]
+    ) -> Tuple[Optional[genai.GenerativeModel], str]:
+        """
+        Model override and prompt to send: with gemini_context_cache_enabled, a model
+        bound to cached content holding static_prefix and the rest of the prompt
+        """
+
+        if (
+            self.settings.gemini_context_cache_enabled
+            and static_prefix
+            and prompt.startswith(static_prefix)
+        ):
+            model = await self._context_model(static_prefix)
+            if model is not None:
+                return model, prompt[len(static_prefix):]
+        return None, prompt
+
+    async def generate(
+        self,
+        prompt: str,
+        identifier: Optional[str] = None,
+        template_id: Optional[str] = None,
+        json_only: bool = False,
+        static_prefix: Optional[str] = None
+    ) -> str:
+        """
+        Generate a response for the prompt and return its text.
+        When identifier (e.g. a component name) is given, a response cached for a
+        prompt from the same template that differs only in that identifier is
+        reused with the name swapped. With json_only, the response is cut off as
+        soon as its first JSON document is complete and only that document is
+        returned. static_prefix is the part of the prompt shared by every call
+        from the same template; with gemini_context_cache_enabled it is stored
+        as Gemini cached content and only the rest of the prompt is sent.
+        """
+
+        key = structural_key = None
+        if self.cache is not None:
+            key = self.cache_key(prompt, json_only=json_only)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            skeleton = mask_identifier(prompt, identifier) if identifier else None
+            if skeleton is not None:
+                structural_key = self.cache_key(
+                    skeleton, structural=True, template_id=template_id, json_only=json_only
+                )
+                cached = await self.cache.get(structural_key)
+                if cached is not None:
+                    entry = json_utils.loads(cached)
+                    text = substitute_identifier(entry["response"], entry["identifier"], identifier)
+                    if text is not None:
+                        await self.cache.set(key, text)
+                        return text
+
+        call = functools.partial(
+            self._generate_uncached, prompt, json_only, static_prefix, key, structural_key, identifier
+        )
+        if key is None:
+            return await call()
+
+        # Concurrent requests for the same cacheable prompt (e.g. several projects
+        # on the same stack) share one Gemini call instead of each missing the cache
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A cancelled caller must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        json_only: bool,
+        static_prefix: Optional[str],
+        key: Optional[str],
+        structural_key: Optional[str],
+        identifier: Optional[str]
+    ) -> str:
+        """Call Gemini for generate and cache the response under the given keys"""
+
+        model, request_prompt = await self._request_model(prompt, static_prefix)
+        if json_only:
+            text = await self._stream_json_with_retry(request_prompt, model)
+        else:
+            text = await self._submit_with_retry(request_prompt, model)
+
+        if key is not None:
+            await self.cache.set(key, text)
+        if structural_key is not None:
+            await self.cache.set(
+                structural_key,
+                json_utils.dumps({"identifier": identifier, "response": text})
+            )
+        return text
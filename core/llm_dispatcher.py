@@ -0,0 +1,134 @@
+"""
+Vibe Coding System - LLM Dispatcher
+Shared worker pool that issues Gemini calls on behalf of all agents
+"""
+
+import asyncio
+import collections
+import time
+import google.generativeai as genai
+from typing import Any, AsyncIterator, Deque, List, Optional, Tuple
+
+# Gemini quotas are enforced per minute
+_RATE_WINDOW_SECONDS = 60.0
+
+# Marks the end of a job's response stream
+_DONE = object()
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+
+    return len(prompt) // 4 + 1
+
+
+class RateLimiter:
+    """Sliding-window limiter on requests and estimated tokens per minute"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window: Deque[Tuple[float, int]] = collections.deque()
+        self._window_tokens = 0
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until a request of the given token estimate fits in the window"""
+
+        # A single prompt larger than the whole budget must still go through
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= _RATE_WINDOW_SECONDS:
+                self._window_tokens -= self._window.popleft()[1]
+
+            if (
+                len(self._window) < self.requests_per_minute
+                and self._window_tokens + tokens <= self.tokens_per_minute
+            ):
+                self._window.append((now, tokens))
+                self._window_tokens += tokens
+                return
+
+            # Sleep until the oldest request falls out of the window
+            await asyncio.sleep(self._window[0][0] + _RATE_WINDOW_SECONDS - now)
+
+
+class LLMDispatcher:
+    """
+    A fixed pool of workers consuming one queue of prompt jobs. Every agent that
+    submits through the same dispatcher shares its worker count as the cap on
+    in-flight Gemini calls, and requests leave the queue in submission order
+    rather than in correlated bursts.
+    """
+
+    def __init__(self, model: genai.GenerativeModel, rate_limiter: RateLimiter, workers: int):
+        self.model = model
+        self.rate_limiter = rate_limiter
+        self.workers = workers
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_workers(self) -> None:
+        """Start the workers on first use, and again if the event loop has changed"""
+
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self.queue = asyncio.Queue()
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            prompt, model, chunks, abandoned = await self.queue.get()
+            try:
+                if abandoned.is_set():
+                    continue
+                await self.rate_limiter.acquire(estimate_tokens(prompt))
+                response = await (model or self.model).generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    # Free the worker as soon as the submitter stops reading
+                    if abandoned.is_set():
+                        break
+                    chunks.put_nowait(chunk.text)
+                chunks.put_nowait(_DONE)
+            except BaseException as e:
+                # Hand the failure to the submitter; only cancellation stops the worker
+                chunks.put_nowait(e)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+            finally:
+                self.queue.task_done()
+
+    async def stream(
+        self,
+        prompt: str,
+        model: Optional[genai.GenerativeModel] = None
+    ) -> AsyncIterator[str]:
+        """
+        Queue the prompt and yield its response text as the worker streams it.
+        model overrides the dispatcher's model for this job, e.g. one bound to
+        cached content. Closing the generator early stops the worker reading the
+        rest of the response.
+        """
+
+        self._ensure_workers()
+        chunks: asyncio.Queue = asyncio.Queue()
+        abandoned = asyncio.Event()
+        await self.queue.put((prompt, model, chunks, abandoned))
+        try:
+            while True:
+                item: Any = await chunks.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            abandoned.set()
+
+    async def submit(self, prompt: str, model: Optional[genai.GenerativeModel] = None) -> str:
+        """Queue the prompt and return the complete response text"""
+
+        return "".join([chunk async for chunk in self.stream(prompt, model)])
@@ -0,0 +1,138 @@
+"""
+Vibe Coding System - Project Archive
+Streams a project directory as a zip archive built on the fly
+"""
+
+import asyncio
+import os
+import threading
+import zipfile
+from typing import AsyncIterator, Optional
+
+# Size of the chunks handed to the response
+_CHUNK_SIZE = 64 * 1024
+# Chunks buffered between the zip thread and the response before the thread waits
+_MAX_BUFFERED_CHUNKS = 16
+# Marks the end of the archive
+_DONE = object()
+
+
+class _ArchiveCancelled(Exception):
+    """Raised in the zip thread once the response is no longer being read"""
+
+
+class _ChunkWriter:
+    """
+    Write-only, non-seekable file object that passes the zip data to the response
+    in fixed-size chunks. zipfile writes data descriptors when it cannot seek, so
+    the archive never needs to exist in full on disk or in memory.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        chunks: asyncio.Queue,
+        credits: threading.Semaphore,
+        cancelled: threading.Event
+    ):
+        self._loop = loop
+        self._chunks = chunks
+        # One credit per chunk the response may have buffered; the consumer returns
+        # a credit for each chunk it takes, so a slow client pauses the zip thread
+        self._credits = credits
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= _CHUNK_SIZE:
+            self.put(bytes(self._buffer[:_CHUNK_SIZE]))
+            del self._buffer[:_CHUNK_SIZE]
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        if self._buffer:
+            self.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def put(self, item: object) -> None:
+        # Give up instead of blocking forever once the reader has gone
+        while not self._credits.acquire(timeout=0.5):
+            if self._cancelled.is_set():
+                raise _ArchiveCancelled()
+        if self._cancelled.is_set():
+            raise _ArchiveCancelled()
+        try:
+            self._loop.call_soon_threadsafe(self._chunks.put_nowait, item)
+        except RuntimeError:
+            # The event loop has closed
+            raise _ArchiveCancelled()
+
+
+def _write_archive(project_path: str, writer: _ChunkWriter) -> None:
+    """Zip every file under project_path into writer, with paths relative to it"""
+
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for root, dirs, files in os.walk(project_path):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                archive.write(path, arcname=os.path.relpath(path, project_path))
+    writer.finish()
+
+
+async def stream_project_zip(project_path: str) -> AsyncIterator[bytes]:
+    """
+    Yield a zip archive of project_path in chunks of about 64 KiB. The archive is
+    compressed in a dedicated thread (zlib releases the GIL) while earlier chunks
+    are sent, so memory use stays bounded regardless of project size. The thread is
+    not taken from the default executor, and the response awaits chunks without
+    holding a thread, so slow downloads cannot starve other to_thread work.
+    """
+
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    credits = threading.Semaphore(_MAX_BUFFERED_CHUNKS)
+    cancelled = threading.Event()
+    writer = _ChunkWriter(loop, chunks, credits, cancelled)
+
+    def produce() -> None:
+        error: Optional[BaseException] = None
+        try:
+            _write_archive(project_path, writer)
+        except _ArchiveCancelled:
+            return
+        except BaseException as e:
+            error = e
+        try:
+            writer.put(error if error is not None else _DONE)
+        except _ArchiveCancelled:
+            pass
+
+    threading.Thread(target=produce, name="project-zip", daemon=True).start()
+    try:
+        while True:
+            item = await chunks.get()
+            credits.release()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Stops the zip thread at its next write
+        cancelled.set()
@@ -0,0 +1,467 @@
+"""
+Vibe Coding System - Project Store
+Persistence for project records (status, progress and details) shared by the API,
+and for their artifacts (plans, architectures, agent results), stored compressed
+"""
+
+import asyncio
+import collections
+import dataclasses
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
+
+from core import json_utils
+from core.config import Settings
+
+# Statuses after which a project no longer changes and may expire
+_FINISHED_STATUSES = ("completed", "error")
+
+# Expired and surplus finished projects are swept whenever a project finishes, and
+# otherwise at most this often; reads skip expired records in between
+_EVICTION_INTERVAL_SECONDS = 60.0
+
+
+@dataclass(slots=True)
+class ProjectRecord:
+    """A project's status and progress, its request details and the names of its artifacts"""
+
+    id: str
+    name: str
+    # Resolved project directory; empty for records stored before it was recorded
+    path: str = ""
+    status: str = "initializing"
+    progress: float = 0.0
+    details: Dict[str, Any] = field(default_factory=dict)
+    artifacts: List[str] = field(default_factory=list)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED_STATUSES
+
+    def to_json(self) -> str:
+        return json_utils.dumps(dataclasses.asdict(self))
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> "ProjectRecord":
+        # Ignore fields this version does not know, e.g. from a newer release
+        stored = json_utils.loads(data)
+        return cls(**{name: value for name, value in stored.items() if name in _RECORD_FIELDS})
+
+
+_RECORD_FIELDS = frozenset(f.name for f in dataclasses.fields(ProjectRecord))
+
+
+class ProjectStore(Protocol):
+    """Async store of project records keyed by project ID"""
+
+    async def get(self, project_id: str) -> Optional[ProjectRecord]:
+        ...
+
+    async def set(self, project_id: str, project: ProjectRecord) -> None:
+        ...
+
+    async def update(self, project_id: str, project: ProjectRecord) -> bool:
+        """Overwrite an existing record; returns False, writing nothing, if it is gone"""
+        ...
+
+    async def get_many(self, project_ids: List[str]) -> Dict[str, ProjectRecord]:
+        ...
+
+    async def set_many(self, projects: Dict[str, ProjectRecord]) -> None:
+        ...
+
+    async def delete(self, project_id: str) -> None:
+        ...
+
+    async def list(self) -> List[ProjectRecord]:
+        ...
+
+    async def set_artifacts(self, project_id: str, artifacts: Dict[str, Any]) -> None:
+        ...
+
+    async def get_artifact(self, project_id: str, name: str) -> Optional[bytes]:
+        """The artifact as JSON bytes, or None if the project has no such artifact"""
+        ...
+
+    async def claim_submission(self, key: str, project_id: str, ttl_seconds: float) -> str:
+        """
+        Atomically map a submission key to project_id for ttl_seconds and return
+        project_id, unless the key is already mapped to a stored project that has
+        not failed; then that project's ID is returned and nothing changes. A key
+        whose project is gone (deleted or evicted) is taken over, so the caller
+        must store project_id's record before claiming.
+        """
+        ...
+
+    async def release_submission(self, key: str, project_id: str) -> None:
+        """Drop the key's mapping if it still points to project_id"""
+        ...
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json_utils.dumps(value).encode("utf-8"))
+
+
+def _is_expired(project: ProjectRecord, updated_at: float, ttl_seconds: int) -> bool:
+    """Finished projects expire ttl_seconds after their last update"""
+
+    return project.finished and time.time() - updated_at > ttl_seconds
+
+
+class MemoryProjectStore:
+    """
+    Process-local store; records are lost on restart and not shared between workers.
+    Records are kept in least recently used order, and once more than max_finished
+    finished projects are held the least recently used are dropped. Projects still
+    in progress are never evicted.
+    """
+
+    def __init__(self, ttl_seconds: int, max_finished: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._projects: "collections.OrderedDict[str, Tuple[float, ProjectRecord]]" = collections.OrderedDict()
+        self._artifacts: Dict[str, Dict[str, bytes]] = {}
+        # Submission key -> (expiry time, project ID)
+        self._submissions: Dict[str, Tuple[float, str]] = {}
+        self._last_eviction = 0.0
+
+    def _evict_expired(self, force: bool = False) -> None:
+        if not force and time.monotonic() - self._last_eviction < _EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction = time.monotonic()
+
+        expired = [
+            project_id for project_id, (updated_at, project) in self._projects.items()
+            if _is_expired(project, updated_at, self.ttl_seconds)
+        ]
+        for project_id in expired:
+            del self._projects[project_id]
+
+        finished = [
+            project_id for project_id, (_, project) in self._projects.items()
+            if project.finished
+        ]
+        for project_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._projects[project_id]
+
+        for project_id in [project_id for project_id in self._artifacts if project_id not in self._projects]:
+            del self._artifacts[project_id]
+
+        now = time.time()
+        for key in [key for key, (expires_at, _) in self._submissions.items() if expires_at < now]:
+            del self._submissions[key]
+
+    async def get(self, project_id: str) -> Optional[ProjectRecord]:
+        entry = self._projects.get(project_id)
+        if entry is None:
+            return None
+        if _is_expired(entry[1], entry[0], self.ttl_seconds):
+            del self._projects[project_id]
+            return None
+        self._projects.move_to_end(project_id)
+        return entry[1]
+
+    async def set(self, project_id: str, project: ProjectRecord) -> None:
+        self._projects[project_id] = (time.time(), project)
+        self._projects.move_to_end(project_id)
+        self._evict_expired(force=project.finished)
+
+    async def update(self, project_id: str, project: ProjectRecord) -> bool:
+        if project_id not in self._projects:
+            return False
+        await self.set(project_id, project)
+        return True
+
+    async def get_many(self, project_ids: List[str]) -> Dict[str, ProjectRecord]:
+        projects = {}
+        for project_id in project_ids:
+            project = await self.get(project_id)
+            if project is not None:
+                projects[project_id] = project
+        return projects
+
+    async def set_many(self, projects: Dict[str, ProjectRecord]) -> None:
+        now = time.time()
+        for project_id, project in projects.items():
+            self._projects[project_id] = (now, project)
+            self._projects.move_to_end(project_id)
+        self._evict_expired(force=any(project.finished for project in projects.values()))
+
+    async def delete(self, project_id: str) -> None:
+        self._projects.pop(project_id, None)
+        self._artifacts.pop(project_id, None)
+        for key in [key for key, (_, owner_id) in self._submissions.items() if owner_id == project_id]:
+            del self._submissions[key]
+
+    async def list(self) -> List[ProjectRecord]:
+        self._evict_expired(force=True)
+        return [project for _, project in self._projects.values()]
+
+    async def set_artifacts(self, project_id: str, artifacts: Dict[str, Any]) -> None:
+        stored = self._artifacts.setdefault(project_id, {})
+        for name, value in artifacts.items():
+            stored[name] = _pack(value)
+
+    async def get_artifact(self, project_id: str, name: str) -> Optional[bytes]:
+        data = self._artifacts.get(project_id, {}).get(name)
+        if data is None:
+            return None
+        return zlib.decompress(data)
+
+    async def claim_submission(self, key: str, project_id: str, ttl_seconds: float) -> str:
+        now = time.time()
+        entry = self._submissions.get(key)
+        if entry is not None and entry[0] >= now:
+            owner = self._projects.get(entry[1])
+            if (
+                owner is not None
+                and not _is_expired(owner[1], owner[0], self.ttl_seconds)
+                and owner[1].status != "error"
+            ):
+                return entry[1]
+        self._submissions[key] = (now + ttl_seconds, project_id)
+        return project_id
+
+    async def release_submission(self, key: str, project_id: str) -> None:
+        entry = self._submissions.get(key)
+        if entry is not None and entry[1] == project_id:
+            del self._submissions[key]
+
+
+class SQLiteProjectStore:
+    """
+    Store backed by one SQLite table in WAL mode, so records survive restarts and
+    are shared by every uvicorn worker on the host. Queries run off the event loop.
+    Beyond max_finished finished projects the least recently updated are deleted.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: int, max_finished: int):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection is shared by the to_thread workers, one query at a time
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS projects ("
+                "id TEXT PRIMARY KEY, status TEXT, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                "project_id TEXT NOT NULL, name TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (project_id, name))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS submissions ("
+                "key TEXT PRIMARY KEY, project_id TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            # For the eviction sweep
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS projects_status_updated_at ON projects (status, updated_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS submissions_expires_at ON submissions (expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def _evict_expired(self, conn: sqlite3.Connection, force: bool = False) -> None:
+        if not force and time.monotonic() - self._last_eviction < _EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction = time.monotonic()
+
+        placeholders = ", ".join("?" for _ in _FINISHED_STATUSES)
+        conn.execute(
+            f"DELETE FROM projects WHERE status IN ({placeholders}) AND updated_at < ?",
+            (*_FINISHED_STATUSES, time.time() - self.ttl_seconds)
+        )
+        conn.execute(
+            f"DELETE FROM projects WHERE id IN (SELECT id FROM projects WHERE status IN ({placeholders}) "
+            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (*_FINISHED_STATUSES, self.max_finished)
+        )
+        conn.execute("DELETE FROM artifacts WHERE project_id NOT IN (SELECT id FROM projects)")
+        conn.execute("DELETE FROM submissions WHERE expires_at < ?", (time.time(),))
+
+    def _get(self, project_id: str) -> Optional[ProjectRecord]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT data, updated_at FROM projects WHERE id = ?", (project_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        project = ProjectRecord.from_json(row[0])
+        if _is_expired(project, row[1], self.ttl_seconds):
+            return None
+        return project
+
+    def _set(self, project_id: str, project: ProjectRecord) -> None:
+        data = project.to_json()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._evict_expired(conn, force=project.finished)
+                conn.execute(
+                    "INSERT OR REPLACE INTO projects (id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+                    (project_id, project.status, data, time.time())
+                )
+
+    def _update(self, project_id: str, project: ProjectRecord) -> bool:
+        data = project.to_json()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._evict_expired(conn, force=project.finished)
+                cursor = conn.execute(
+                    "UPDATE projects SET status = ?, data = ?, updated_at = ? WHERE id = ?",
+                    (project.status, data, time.time(), project_id)
+                )
+        return cursor.rowcount > 0
+
+    def _get_many(self, project_ids: List[str]) -> Dict[str, ProjectRecord]:
+        if not project_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in project_ids)
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT id, data, updated_at FROM projects WHERE id IN ({placeholders})",
+                tuple(project_ids)
+            ).fetchall()
+        projects = {}
+        for project_id, data, updated_at in rows:
+            project = ProjectRecord.from_json(data)
+            if not _is_expired(project, updated_at, self.ttl_seconds):
+                projects[project_id] = project
+        return projects
+
+    def _set_many(self, projects: Dict[str, ProjectRecord]) -> None:
+        now = time.time()
+        rows = [
+            (project_id, project.status, project.to_json(), now)
+            for project_id, project in projects.items()
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._evict_expired(conn, force=any(project.finished for project in projects.values()))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO projects (id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+
+    def _delete(self, project_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+                conn.execute("DELETE FROM artifacts WHERE project_id = ?", (project_id,))
+                conn.execute("DELETE FROM submissions WHERE project_id = ?", (project_id,))
+
+    def _list(self) -> List[ProjectRecord]:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._evict_expired(conn, force=True)
+            rows = conn.execute("SELECT data FROM projects ORDER BY updated_at").fetchall()
+        return [ProjectRecord.from_json(row[0]) for row in rows]
+
+    def _set_artifacts(self, project_id: str, artifacts: Dict[str, Any]) -> None:
+        rows = [(project_id, name, _pack(value)) for name, value in artifacts.items()]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO artifacts (project_id, name, data) VALUES (?, ?, ?)", rows
+                )
+
+    def _get_artifact(self, project_id: str, name: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT data FROM artifacts WHERE project_id = ? AND name = ?", (project_id, name)
+            ).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0])
+
+    def _claim_submission(self, key: str, project_id: str, ttl_seconds: float) -> str:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                # Take the write lock up front, so workers cannot both claim the key
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT s.project_id FROM submissions s "
+                    "JOIN projects p ON p.id = s.project_id "
+                    "WHERE s.key = ? AND s.expires_at >= ? AND p.status != 'error'",
+                    (key, now)
+                ).fetchone()
+                # Claims whose project failed or is gone fall through and are replaced
+                if row is not None:
+                    return row[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO submissions (key, project_id, expires_at) VALUES (?, ?, ?)",
+                    (key, project_id, now + ttl_seconds)
+                )
+        return project_id
+
+    def _release_submission(self, key: str, project_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM submissions WHERE key = ? AND project_id = ?", (key, project_id))
+
+    async def get(self, project_id: str) -> Optional[ProjectRecord]:
+        return await asyncio.to_thread(self._get, project_id)
+
+    async def set(self, project_id: str, project: ProjectRecord) -> None:
+        await asyncio.to_thread(self._set, project_id, project)
+
+    async def update(self, project_id: str, project: ProjectRecord) -> bool:
+        return await asyncio.to_thread(self._update, project_id, project)
+
+    async def get_many(self, project_ids: List[str]) -> Dict[str, ProjectRecord]:
+        return await asyncio.to_thread(self._get_many, project_ids)
+
+    async def set_many(self, projects: Dict[str, ProjectRecord]) -> None:
+        await asyncio.to_thread(self._set_many, projects)
+
+    async def delete(self, project_id: str) -> None:
+        await asyncio.to_thread(self._delete, project_id)
+
+    async def list(self) -> List[ProjectRecord]:
+        return await asyncio.to_thread(self._list)
+
+    async def set_artifacts(self, project_id: str, artifacts: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._set_artifacts, project_id, artifacts)
+
+    async def get_artifact(self, project_id: str, name: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get_artifact, project_id, name)
+
+    async def claim_submission(self, key: str, project_id: str, ttl_seconds: float) -> str:
+        return await asyncio.to_thread(self._claim_submission, key, project_id, ttl_seconds)
+
+    async def release_submission(self, key: str, project_id: str) -> None:
+        await asyncio.to_thread(self._release_submission, key, project_id)
+
+
+def create_project_store(settings: Settings) -> ProjectStore:
+    """Build the project store selected by settings.project_store_backend"""
+
+    if settings.project_store_backend == "sqlite":
+        return SQLiteProjectStore(
+            settings.project_store_path, settings.project_ttl_seconds, settings.max_finished_projects
+        )
+    if settings.project_store_backend == "memory":
+        return MemoryProjectStore(settings.project_ttl_seconds, settings.max_finished_projects)
+    raise ValueError(f"Unknown project store backend: {settings.project_store_backend}")
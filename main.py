@@ -6,14 +6,24 @@ Built with Google ADK, FastAPI, and Gemini 2 Flash
 import os
 import asyncio
 import logging
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, BackgroundTasks, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import Dict, List, Optional, Any, Set
+from collections import defaultdict
 import uuid
-import json
+import hashlib
 import shutil
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# ARQ is only needed when projects are processed by a separate worker (see workers.py)
+try:
+    from arq import create_pool
+    from arq.connections import ArqRedis, RedisSettings
+except ImportError:
+    create_pool = None
 
 # Local imports
 from agents.project_manager import ProjectManagerAgent
@@ -22,18 +32,25 @@ from agents.backend import BackendAgent
 from agents.ai import AIAgent
 from agents.technical_writer import TechnicalWriterAgent
 from core.file_manager import FileManager
+from core import json_utils, llm_client
+from core.agent_scheduler import FairAgentScheduler
 from core.config import Settings
+from core.project_archive import stream_project_zip
+from core.project_store import ProjectRecord, create_project_store
 from core.utils import setup_logging
 
 # Initialize settings and logging
 settings = Settings()
+settings.check_agent_prompts()
 logger = setup_logging()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Vibe Coding System",
     description="An advanced coding system using Google ADK and Gemini 2 Flash for automated code generation",
-    version="1.0.0"
+    version="1.0.0",
+    # Status polling is the hot read path; orjson serializes the large plan blobs much faster
+    default_response_class=ORJSONResponse if json_utils.orjson is not None else JSONResponse
 )
 
 # Add CORS middleware
@@ -53,8 +70,16 @@ backend_agent = BackendAgent(settings, file_manager)
 ai_agent = AIAgent(settings, file_manager)
 tech_writer = TechnicalWriterAgent(settings, file_manager)
 
-# In-memory store for active projects
-active_projects = {}
+# Bounds agent steps running at once across all projects, so concurrent projects
+# queue for agents instead of piling up Gemini calls; waiting steps are served
+# round-robin across projects so a large project cannot starve small ones
+AGENT_SCHEDULER = FairAgentScheduler(settings.max_concurrent_agents, settings.agent_max_wait_seconds)
+
+# Store for project records, shared across restarts and workers by default
+project_store = create_project_store(settings)
+
+# Job queue for project processing when task_queue_backend is "arq"
+arq_pool: Optional["ArqRedis"] = None
 
 class ProjectRequest(BaseModel):
     project_name: str
@@ -65,44 +90,142 @@ class ProjectRequest(BaseModel):
     include_ai: Optional[bool] = False
     deployment_target: Optional[str] = "docker"
     
+    @field_validator("project_name")
+    @classmethod
+    def check_project_name(cls, value: str) -> str:
+        # The name becomes a directory directly under projects_root_dir
+        if value.strip() in ("", ".", "..") or any(char in value for char in "/\\\0"):
+            raise ValueError("project_name must be a single directory name")
+        return value
+    
+class BatchProjectRequest(BaseModel):
+    # Validated item by item against ProjectRequest, so one bad item does not
+    # reject the whole batch
+    projects: List[Dict[str, Any]]
+    
 class ProjectStatus(BaseModel):
     project_id: str
     status: str
     progress: float
     details: Optional[Dict] = None
+    # Names of the artifacts available from /project/{project_id}/artifacts/{name}
+    artifacts: List[str] = []
+
+@app.on_event("startup")
+async def configure_io_threads():
+    """Size the default thread pool used for to_thread filesystem work"""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.io_threads, thread_name_prefix="io")
+    )
+
+@app.on_event("startup")
+async def connect_task_queue():
+    """Connect to the ARQ job queue if projects are processed by separate workers"""
+    global arq_pool
+    if settings.task_queue_backend != "arq":
+        return
+    if create_pool is None:
+        raise RuntimeError("task_queue_backend is 'arq' but the arq package is not installed")
+    arq_pool = await create_pool(RedisSettings.from_dsn(settings.redis_url))
+
+@app.on_event("startup")
+async def warm_up_gemini():
+    """Establish the Gemini connection before the first project needs it"""
+    if settings.gemini_warm_up:
+        await llm_client.warm_up(settings)
+
+async def schedule_project(background_tasks: BackgroundTasks, project_id: str, request: ProjectRequest):
+    """Run process_project_request on an ARQ worker if configured, else in this process"""
+    if arq_pool is not None:
+        await arq_pool.enqueue_job("process_project_request_task", project_id, request.model_dump())
+    else:
+        background_tasks.add_task(process_project_request, project_id, request)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Vibe Coding System API"}
 
-@app.post("/project", response_model=Dict)
-async def create_project(request: ProjectRequest, background_tasks: BackgroundTasks):
-    """Create a new coding project based on the description"""
-    project_id = str(uuid.uuid4())
-    
-    # Create project record
-    active_projects[project_id] = {
-        "id": project_id,
-        "name": request.project_name,
-        "status": "initializing",
-        "progress": 0.0,
-        "details": {
+def project_dir(project_name: str) -> str:
+    """Absolute directory of a project, refusing names that resolve outside projects_root_dir"""
+    root = Path(settings.projects_root_dir).resolve()
+    path = (root / project_name).resolve()
+    if path == root or not path.is_relative_to(root):
+        raise ValueError(f"Invalid project name: {project_name!r}")
+    return str(path)
+
+def record_path(project: ProjectRecord) -> str:
+    # Records created before the path was stored only have the name
+    return project.path or project_dir(project.name)
+
+def new_project_record(project_id: str, request: ProjectRequest) -> ProjectRecord:
+    """Initial store record for a newly submitted project"""
+    return ProjectRecord(
+        id=project_id,
+        name=request.project_name,
+        path=project_dir(request.project_name),
+        details={
             "description": request.description,
             "frontend_framework": request.frontend_framework,
             "backend_framework": request.backend_framework,
             "database": request.database,
             "include_ai": request.include_ai,
-            "deployment_target": request.deployment_target,
-            "created_files": []
+            "deployment_target": request.deployment_target
         }
-    }
-    
-    # Start project generation in background
-    background_tasks.add_task(
-        process_project_request,
-        project_id,
-        request
     )
+
+def project_status(project_id: str, project: ProjectRecord) -> ProjectStatus:
+    return ProjectStatus(
+        project_id=project_id,
+        status=project.status,
+        progress=project.progress,
+        details=project.details,
+        artifacts=project.artifacts
+    )
+
+def submission_key(request: ProjectRequest, idempotency_key: Optional[str]) -> str:
+    """Identifies repeated submissions: the client's Idempotency-Key, else a hash of the request"""
+    if idempotency_key:
+        return f"key:{idempotency_key}"
+    body = json_utils.dumps(request.model_dump(), sort_keys=True)
+    return f"body:{hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest()}"
+
+@app.post("/project", response_model=Dict)
+async def create_project(
+    request: ProjectRequest,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """Create a new coding project based on the description"""
+    project_id = str(uuid.uuid4())
+    
+    # Create project record
+    await project_store.set(project_id, new_project_record(project_id, request))
+    
+    key = submission_key(request, idempotency_key) if settings.submission_dedupe_seconds > 0 else None
+    try:
+        # A retried submission gets the project already created for it (unless that
+        # one failed or is gone) instead of paying for a second generation
+        if key is not None:
+            existing_id = await project_store.claim_submission(
+                key, project_id, settings.submission_dedupe_seconds
+            )
+            if existing_id != project_id:
+                await project_store.delete(project_id)
+                return {
+                    "project_id": existing_id,
+                    "message": "Project already submitted",
+                    "status_endpoint": f"/project/{existing_id}/status"
+                }
+        
+        # Start project generation in background
+        await schedule_project(background_tasks, project_id, request)
+    except Exception:
+        # Don't leave a claim pointing at a project that will never run
+        if key is not None:
+            await project_store.release_submission(key, project_id)
+        await project_store.delete(project_id)
+        raise
     
     return {
         "project_id": project_id, 
@@ -110,146 +233,323 @@ async def create_project(request: ProjectRequest, background_tasks: BackgroundTa
         "status_endpoint": f"/project/{project_id}/status"
     }
 
+@app.post("/projects/batch", response_model=Dict)
+async def create_projects_batch(request: BatchProjectRequest, background_tasks: BackgroundTasks):
+    """
+    Create several projects in one request. Each item is validated on its own, so
+    invalid items are reported in errors without rejecting the rest of the batch.
+    """
+    if len(request.projects) > settings.max_batch_projects:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.max_batch_projects} projects per batch"
+        )
+    
+    accepted: Dict[str, ProjectRequest] = {}
+    indices: Dict[str, int] = {}
+    errors = []
+    for index, item in enumerate(request.projects):
+        try:
+            project_id = str(uuid.uuid4())
+            accepted[project_id] = ProjectRequest(**item)
+            indices[project_id] = index
+        except ValidationError as e:
+            errors.append({"index": index, "error": str(e)})
+    
+    # Create all project records in one store write
+    await project_store.set_many({
+        project_id: new_project_record(project_id, project_request)
+        for project_id, project_request in accepted.items()
+    })
+    
+    # Start project generation in background
+    project_ids = []
+    for project_id, project_request in accepted.items():
+        try:
+            await schedule_project(background_tasks, project_id, project_request)
+        except Exception as e:
+            # Projects that could not be scheduled would never leave "initializing";
+            # drop their records and report them as errors instead
+            logger.error(f"Error scheduling batch projects: {str(e)}")
+            unscheduled = [pending_id for pending_id in accepted if pending_id not in project_ids]
+            await asyncio.gather(*(project_store.delete(pending_id) for pending_id in unscheduled))
+            errors.extend(
+                {"index": indices[pending_id], "error": f"Could not schedule project: {str(e)}"}
+                for pending_id in unscheduled
+            )
+            errors.sort(key=lambda error: error["index"])
+            break
+        project_ids.append(project_id)
+    
+    return {
+        "project_ids": project_ids,
+        "errors": errors,
+        "message": f"Creation initiated for {len(project_ids)} of {len(request.projects)} projects",
+        "status_endpoint": f"/projects/batch/status?ids={','.join(project_ids)}"
+    }
+
+@app.get("/projects/batch/status", response_model=Dict)
+async def get_projects_batch_status(ids: str):
+    """Get the status of several projects, given as comma-separated IDs"""
+    project_ids = [project_id for project_id in ids.split(",") if project_id]
+    projects = await project_store.get_many(project_ids)
+    
+    return {
+        "projects": [project_status(project_id, project) for project_id, project in projects.items()],
+        "not_found": [project_id for project_id in project_ids if project_id not in projects]
+    }
+
 @app.get("/project/{project_id}/status", response_model=ProjectStatus)
 async def get_project_status(project_id: str):
     """Get the current status of a project"""
-    if project_id not in active_projects:
+    project = await project_store.get(project_id)
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = active_projects[project_id]
-    return ProjectStatus(
-        project_id=project_id,
-        status=project["status"],
-        progress=project["progress"],
-        details=project["details"]
+    return project_status(project_id, project)
+
+@app.get("/project/{project_id}/artifacts/{name}")
+async def get_project_artifact(project_id: str, name: str):
+    """Get one of a project's artifacts, e.g. its project_plan or frontend_results"""
+    project = await project_store.get(project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Stored as JSON, so it is returned without being parsed and re-serialized
+    data = await project_store.get_artifact(project_id, name)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return Response(content=data, media_type="application/json")
+
+@app.get("/project/{project_id}/events")
+async def project_events(project_id: str, request: Request):
+    """Stream the project's status and progress as server-sent events until it finishes"""
+    project = await project_store.get(project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+        progress_subscribers[project_id].add(queue)
+        try:
+            current, last = progress_event(project), None
+            while current is not None:
+                if current != last:
+                    yield f"data: {json_utils.dumps(current)}\n\n"
+                    last = current
+                else:
+                    # Keep idle connections open through proxies
+                    yield ": keepalive\n\n"
+                if current["status"] in FINISHED_STATUSES:
+                    return
+                if await request.is_disconnected():
+                    return
+                try:
+                    current = await asyncio.wait_for(queue.get(), timeout=EVENTS_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    stored = await project_store.get(project_id)
+                    current = progress_event(stored) if stored is not None else None
+        finally:
+            subscribers = progress_subscribers.get(project_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del progress_subscribers[project_id]
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
     )
 
 @app.get("/project/{project_id}/download")
 async def download_project(project_id: str):
-    """Get download link for the completed project"""
-    if project_id not in active_projects:
+    """Download the completed project as a zip archive"""
+    project = await project_store.get(project_id)
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = active_projects[project_id]
-    if project["status"] != "completed":
+    if project.status != "completed":
         raise HTTPException(status_code=400, detail="Project not ready for download")
     
-    # In a real implementation, this would generate a download URL
-    # Here we just return the path
-    project_path = os.path.join(settings.projects_root_dir, project["name"])
-    return {"download_path": project_path}
+    project_path = record_path(project)
+    if not os.path.isdir(project_path):
+        raise HTTPException(status_code=404, detail="Project files not found")
+    
+    # The archive is built while it is sent, so the first bytes go out immediately
+    return StreamingResponse(
+        stream_project_zip(project_path),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{project.name}.zip"'}
+    )
 
 @app.delete("/project/{project_id}")
 async def delete_project(project_id: str):
     """Delete a project"""
-    if project_id not in active_projects:
+    project = await project_store.get(project_id)
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = active_projects[project_id]
-    project_path = os.path.join(settings.projects_root_dir, project["name"])
+    project_path = record_path(project)
     
-    # Remove the project directory
-    if os.path.exists(project_path):
-        shutil.rmtree(project_path)
+    # Remove the project directory off the event loop
+    await asyncio.to_thread(shutil.rmtree, project_path, ignore_errors=True)
     
-    # Remove from active projects
-    del active_projects[project_id]
+    # Remove from the project store
+    await project_store.delete(project_id)
     return {"message": "Project deleted successfully"}
 
-async def process_project_request(project_id: str, request: ProjectRequest):
-    """Process a project request using the agent architecture"""
-    try:
-        project = active_projects[project_id]
-        project_path = os.path.join(settings.projects_root_dir, request.project_name)
-        
-        # Set up clean project directory
-        if os.path.exists(project_path):
-            shutil.rmtree(project_path)
-        os.makedirs(project_path)
-        
-        # Update status
-        project["status"] = "planning"
-        project["progress"] = 0.1
-        
-        # Step 1: Project Manager creates plan
-        logger.info(f"Project {project_id}: Creating project plan")
-        project_plan = await project_manager.create_project_plan(
-            project_id=project_id,
-            project_name=request.project_name,
-            description=request.description,
-            frontend_framework=request.frontend_framework,
-            backend_framework=request.backend_framework,
-            database=request.database,
-            include_ai=request.include_ai,
-            deployment_target=request.deployment_target
-        )
-        
-        # Update status
-        project["status"] = "designing_architecture"
-        project["progress"] = 0.2
-        project["details"]["project_plan"] = project_plan
-        
-        # Step 2: Project Manager creates architecture
-        logger.info(f"Project {project_id}: Creating architecture")
-        architecture = await project_manager.create_architecture(
-            project_id=project_id,
-            project_plan=project_plan
-        )
-        
-        # Update status
-        project["status"] = "creating_frontend"
-        project["progress"] = 0.3
-        project["details"]["architecture"] = architecture
-        
-        # Step 3: Frontend Agent creates UI/UX
-        logger.info(f"Project {project_id}: Creating frontend")
-        frontend_tasks = project_plan.get("frontend_tasks", [])
-        frontend_results = await frontend_agent.implement_frontend(
-            project_id=project_id,
-            project_name=request.project_name,
-            tasks=frontend_tasks,
-            architecture=architecture.get("frontend", {})
-        )
-        
-        # Update status
-        project["status"] = "creating_backend"
-        project["progress"] = 0.5
-        project["details"]["frontend_results"] = frontend_results
-        
-        # Step 4: Backend Agent creates server code
-        logger.info(f"Project {project_id}: Creating backend")
-        backend_tasks = project_plan.get("backend_tasks", [])
-        backend_results = await backend_agent.implement_backend(
-            project_id=project_id,
-            project_name=request.project_name,
-            tasks=backend_tasks,
-            architecture=architecture.get("backend", {})
-        )
-        
-        # Update status
-        project["progress"] = 0.7
-        project["details"]["backend_results"] = backend_results
-        
-        # Step 5: AI Agent creates AI components if needed
-        ai_results = {}
-        if request.include_ai:
-            project["status"] = "creating_ai_components"
-            logger.info(f"Project {project_id}: Creating AI components")
-            ai_tasks = project_plan.get("ai_tasks", [])
-            ai_results = await ai_agent.implement_ai_components(
+# Progress reached on entering each status; "error" keeps the progress made so far
+PROGRESS_MAP = {
+    "initializing": 0.0,
+    "planning": 0.1,
+    "creating_components": 0.3,
+    "creating_documentation": 0.8,
+    "finalizing": 0.9,
+    "completed": 1.0,
+}
+
+# Large outputs kept out of the project record, so status polls stay small; they are
+# stored compressed and served by the artifacts endpoint
+ARTIFACT_NAMES = (
+    "project_plan",
+    "architecture",
+    "frontend_results",
+    "backend_results",
+    "ai_results",
+    "doc_results",
+    "final_report",
+    "created_files",
+    "bundle_files",
+)
+
+# Statuses after which a project's progress no longer changes
+FINISHED_STATUSES = ("completed", "error")
+
+class ProjectDeletedError(Exception):
+    """Raised when a running project's record was deleted, to stop its pipeline"""
+
+# Seconds an event stream waits for a local update before re-reading the store,
+# which also picks up projects processed by other workers
+EVENTS_POLL_SECONDS = 15.0
+
+# Queues of the event streams currently open for each project
+progress_subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+def progress_event(project: ProjectRecord) -> Dict[str, Any]:
+    return {"status": project.status, "progress": project.progress}
+
+async def update_progress(
+    project: ProjectRecord,
+    status: Optional[str] = None,
+    progress: Optional[float] = None,
+    **details: Any
+):
+    """
+    Apply a status/progress change and any new details to a project record, save it
+    in one store write and notify the project's open event streams. Details named in
+    ARTIFACT_NAMES are saved as artifacts instead of in the record. Raises
+    ProjectDeletedError if the project has been deleted.
+    """
+    artifacts = {name: value for name, value in details.items() if name in ARTIFACT_NAMES}
+    if artifacts:
+        await project_store.set_artifacts(project.id, artifacts)
+        project.artifacts = sorted(set(project.artifacts) | artifacts.keys())
+    if status is not None:
+        project.status = status
+        project.progress = PROGRESS_MAP.get(status, project.progress)
+    if progress is not None:
+        project.progress = progress
+    project.details.update({name: value for name, value in details.items() if name not in artifacts})
+    # Update only: a project deleted while running must not be written back
+    if not await project_store.update(project.id, project):
+        raise ProjectDeletedError(project.id)
+    
+    event = progress_event(project)
+    for queue in progress_subscribers.get(project.id, ()):
+        queue.put_nowait(event)
+
+async def run_agent_pipeline(project: ProjectRecord, project_id: str, request: ProjectRequest):
+    """Steps 1-6: plan, architecture, components and documentation from the agents"""
+    # Steps 1-2: Project Manager streams the plan and architecture from one call
+    # Steps 3-5: Frontend, Backend and (if needed) AI agents build their parts in
+    # parallel, each starting as soon as the plan and its own architecture
+    # section have arrived; if one step fails the others are cancelled
+    logger.info(f"Project {project_id}: Creating project plan and architecture")
+    project_plan: Dict[str, Any] = {}
+    architecture: Dict[str, Any] = {}
+    components = ["frontend", "backend"] + (["ai"] if request.include_ai else [])
+    ready = {name: asyncio.Event() for name in ["project_plan", *components]}
+    implementations = {
+        "frontend": frontend_agent.implement_frontend,
+        "backend": backend_agent.implement_backend,
+        "ai": ai_agent.implement_ai_components,
+    }
+    
+    # The lock keeps each progress update whole while steps finish in any order
+    progress_lock = asyncio.Lock()
+    phase_progress = 0.4 / len(components)
+    
+    async def plan_phase() -> None:
+        async with AGENT_SCHEDULER.slot(project_id):
+            async for partial in project_manager.stream_plan_and_architecture(
                 project_id=project_id,
                 project_name=request.project_name,
-                tasks=ai_tasks,
-                architecture=architecture.get("ai", {})
+                description=request.description,
+                frontend_framework=request.frontend_framework,
+                backend_framework=request.backend_framework,
+                database=request.database,
+                include_ai=request.include_ai,
+                deployment_target=request.deployment_target
+            ):
+                if "project_plan" in partial:
+                    project_plan.update(partial["project_plan"])
+                    async with progress_lock:
+                        await update_progress(project, "creating_components", project_plan=project_plan)
+                    logger.info(f"Project {project_id}: Creating frontend, backend and AI components")
+                    ready["project_plan"].set()
+                for name, section in partial.get("architecture", {}).items():
+                    architecture[name] = section
+                    if name in ready:
+                        ready[name].set()
+        # Components the architecture does not cover start with an empty section
+        for event in ready.values():
+            event.set()
+        async with progress_lock:
+            await update_progress(project, architecture=architecture)
+    
+    async def report_phase(name: str) -> Any:
+        await ready["project_plan"].wait()
+        await ready[name].wait()
+        # Each phase takes its own slot, so other projects' steps interleave
+        async with AGENT_SCHEDULER.slot(project_id):
+            result = await implementations[name](
+                project_id=project_id,
+                project_name=request.project_name,
+                tasks=project_plan.get(f"{name}_tasks", []),
+                architecture=architecture.get(name, {})
             )
-            project["details"]["ai_results"] = ai_results
-        
-        # Update status
-        project["status"] = "creating_documentation"
-        project["progress"] = 0.8
-        
-        # Step 6: Technical Writer creates documentation
-        logger.info(f"Project {project_id}: Creating documentation")
+        async with progress_lock:
+            await update_progress(
+                project,
+                progress=round(project.progress + phase_progress, 2),
+                **{f"{name}_results": result}
+            )
+        logger.info(f"Project {project_id}: {name} phase completed")
+        return result
+    
+    phases = {"planning": plan_phase()}
+    phases.update({name: report_phase(name) for name in components})
+    phase_results = await project_manager.run_parallel_phase(project_id, phases)
+    
+    frontend_results = phase_results["frontend"]
+    backend_results = phase_results["backend"]
+    ai_results = phase_results.get("ai", {})
+    await update_progress(project, "creating_documentation")
+    
+    # Step 6: Technical Writer creates documentation
+    logger.info(f"Project {project_id}: Creating documentation")
+    async with AGENT_SCHEDULER.slot(project_id):
         doc_results = await tech_writer.create_documentation(
             project_id=project_id,
             project_name=request.project_name,
@@ -259,34 +559,96 @@ async def process_project_request(project_id: str, request: ProjectRequest):
             backend_results=backend_results,
             ai_results=ai_results
         )
+    
+    await update_progress(project, "finalizing", doc_results=doc_results)
+
+async def process_project_request(project_id: str, request: ProjectRequest):
+    """Process a project request using the agent architecture"""
+    project = await project_store.get(project_id)
+    if project is None:
+        logger.info(f"Project {project_id}: Deleted before processing started")
+        return
+    project_path = record_path(project)
+    try:
+        
+        # Set up clean project directory
+        await asyncio.to_thread(shutil.rmtree, project_path, ignore_errors=True)
+        await asyncio.to_thread(os.makedirs, project_path, exist_ok=True)
         
-        # Update status
-        project["status"] = "finalizing"
-        project["progress"] = 0.9
-        project["details"]["doc_results"] = doc_results
+        await update_progress(project, "planning")
+        
+        # Small projects without AI components can opt into a fast path that gets the
+        # plan, architecture, code and docs from one Gemini call; a response that
+        # does not have the expected shape falls back to the agent pipeline
+        bundle = None
+        if not request.include_ai and len(request.description) < settings.fast_path_description_chars:
+            logger.info(f"Project {project_id}: Generating the whole project in one call")
+            async with AGENT_SCHEDULER.slot(project_id):
+                bundle = await project_manager.generate_fullstack_bundle(
+                    project_id=project_id,
+                    project_name=request.project_name,
+                    description=request.description,
+                    frontend_framework=request.frontend_framework,
+                    backend_framework=request.backend_framework,
+                    database=request.database,
+                    deployment_target=request.deployment_target
+                )
+            if bundle is None:
+                logger.warning(f"Project {project_id}: Fast path failed, using the agent pipeline")
+        
+        if bundle is not None:
+            await update_progress(
+                project,
+                "finalizing",
+                project_plan=bundle["project_plan"],
+                architecture=bundle["architecture"],
+                bundle_files=sorted(bundle["files"])
+            )
+        else:
+            await run_agent_pipeline(project, project_id, request)
         
         # Step 7: Project Manager finalizes project
         logger.info(f"Project {project_id}: Finalizing project")
-        final_report = await project_manager.finalize_project(
-            project_id=project_id,
-            project_name=request.project_name
-        )
+        async with AGENT_SCHEDULER.slot(project_id):
+            final_report = await project_manager.finalize_project(
+                project_id=project_id,
+                project_name=request.project_name
+            )
         
-        # Update status
-        project["status"] = "completed"
-        project["progress"] = 1.0
-        project["details"]["final_report"] = final_report
-        project["details"]["created_files"] = file_manager.get_project_files(request.project_name)
+        # Listing the project tree walks the disk; keep it off the event loop
+        created_files = await asyncio.to_thread(file_manager.get_project_files, request.project_name)
+        await update_progress(project, "completed", final_report=final_report, created_files=created_files)
         
         logger.info(f"Project {project_id}: Completed successfully")
         
+    except ProjectDeletedError:
+        logger.info(f"Project {project_id}: Deleted while processing, stopping")
+        # Remove files written since the delete removed the directory, unless a new
+        # project with the same name has taken the directory over in the meantime
+        if not any(record_path(other) == project_path for other in await project_store.list()):
+            await asyncio.to_thread(shutil.rmtree, project_path, ignore_errors=True)
     except Exception as e:
         logger.error(f"Error processing project {project_id}: {str(e)}")
-        project = active_projects.get(project_id)
+        project = await project_store.get(project_id)
         if project:
-            project["status"] = "error"
-            project["details"]["error"] = str(e)
+            try:
+                await update_progress(project, "error", error=str(e))
+            except ProjectDeletedError:
+                pass
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # loop="auto" picks uvloop when it is installed (it does not support Windows);
+    # the agents are almost entirely async orchestration, so per-await scheduling
+    # overhead matters. Reloading is for development (debug) only and cannot be
+    # combined with several workers.
+    if settings.api_workers > 1 and settings.project_store_backend == "memory":
+        logger.warning("The memory project store is not shared between uvicorn workers; use sqlite")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        workers=1 if settings.debug else settings.api_workers,
+        reload=settings.debug
+    )
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Vibe Coding System - Task Queue Workers
+Processes project requests queued by the API when task_queue_backend is "arq".
+Run with: arq workers.WorkerSettings, or python workers.py to run on uvloop
+"""
+
+import asyncio
+from typing import Any, Dict
+
+from arq.connections import RedisSettings
+from arq.worker import create_worker
+
+from main import ProjectRequest, process_project_request, settings
+
+
+async def process_project_request_task(ctx: Dict[str, Any], project_id: str, request_data: Dict[str, Any]):
+    """Run the agent pipeline for a queued project"""
+    await process_project_request(project_id, ProjectRequest(**request_data))
+
+
+class WorkerSettings:
+    functions = [process_project_request_task]
+    redis_settings = RedisSettings.from_dsn(settings.redis_url)
+    # Jobs interrupted by a worker restart are picked up again
+    max_tries = settings.task_max_tries
+    job_timeout = settings.task_timeout_seconds
+
+
+async def run_worker() -> None:
+    """Run a worker like the arq CLI does, on whichever loop is running"""
+    # Created inside the running loop so its signal handlers are attached to it
+    worker = create_worker(WorkerSettings)
+    try:
+        await worker.async_run()
+    except asyncio.CancelledError:
+        # SIGINT/SIGTERM cancel the worker's main task
+        pass
+    finally:
+        await worker.close()
+
+
+if __name__ == "__main__":
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(run_worker())